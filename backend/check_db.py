@@ -1,63 +1,114 @@
 #!/usr/bin/env python
 """Quick script to check database contents."""
+import contextlib
+import io
 import os
+import sys
 import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 os.environ['POSTGRES_HOST'] = 'localhost'
 django.setup()
 
-from django.db.models import Count, Avg
-from core.models import HealthRecord, SleepLog, NutritionLog, DailySummary
-
-print("=" * 50)
-print("DATABASE SUMMARY")
-print("=" * 50)
-print(f"HealthRecords: {HealthRecord.objects.count():,}")
-print(f"SleepLogs: {SleepLog.objects.count():,}")
-print(f"NutritionLogs: {NutritionLog.objects.count():,}")
-print(f"DailySummaries: {DailySummary.objects.count():,}")
-
-print("\n" + "=" * 50)
-print("HEALTH RECORDS BY TYPE")
-print("=" * 50)
-for r in HealthRecord.objects.values('metric_type').annotate(count=Count('id')).order_by('-count'):
-    print(f"  {r['metric_type']}: {r['count']:,}")
-
-print("\n" + "=" * 50)
-print("SAMPLE DAILY SUMMARY (Dec 20, 2025)")
-print("=" * 50)
-from datetime import date
-ds = DailySummary.objects.filter(date=date(2025, 12, 20)).first()
-if ds:
-    print(f"Date: {ds.date}")
-    print(f"  NUTRITION:")
-    print(f"    Calories: {ds.calories} kcal")
-    print(f"    Protein: {ds.protein_g}g ({ds.protein_pct}%)")
-    print(f"    Carbs: {ds.carbs_g}g ({ds.carbs_pct}%)")
-    print(f"    Fat: {ds.fat_g}g ({ds.fat_pct}%)")
-    print(f"  SLEEP:")
-    print(f"    Duration: {ds.sleep_duration_min} min")
-    print(f"    Deep: {ds.deep_sleep_min} min")
-    print(f"    REM: {ds.rem_sleep_min} min")
-    print(f"    Light: {ds.light_sleep_min} min")
-    print(f"    Score: {ds.sleep_score}")
-    print(f"  ACTIVITY:")
-    print(f"    Steps: {ds.steps:,}" if ds.steps else "    Steps: None")
-    print(f"    Distance: {ds.distance_km} km")
-    print(f"  VITALS:")
-    print(f"    Resting HR: {ds.resting_hr} bpm")
-    print(f"    HRV: {ds.hrv_rmssd}")
-    print(f"    Readiness: {ds.readiness_score}")
-    print(f"  Completeness: {ds.data_completeness}%")
-else:
-    print("No data for this date")
-
-print("\n" + "=" * 50)
-print("30-DAY AVERAGES")
-print("=" * 50)
-from core.services import InsightsService
-avgs = InsightsService.get_averages(days=30)
-for key, val in avgs.items():
-    if val:
-        print(f"  {key}: {val:.1f}")
+from django.db import connection
+from django.db.models import Avg
+from core.models import HealthRecord, HealthRecordCount, SleepLog, NutritionLog, DailySummary
+
+SUMMARY_MODELS = [
+    ('HealthRecords', HealthRecord),
+    ('SleepLogs', SleepLog),
+    ('NutritionLogs', NutritionLog),
+    ('DailySummaries', DailySummary),
+]
+
+# Planner estimates for every table in one roundtrip (approximate, but cheap).
+# reltuples is -1 for tables that have never been vacuumed/analyzed.
+with connection.cursor() as cursor:
+    cursor.execute(
+        "SELECT relname, reltuples::bigint FROM pg_class WHERE relname IN %s",
+        [tuple(model._meta.db_table for _, model in SUMMARY_MODELS)]
+    )
+    estimates = dict(cursor.fetchall())
+
+    # Exact counts for any tables without statistics, again in one roundtrip
+    missing = [
+        model._meta.db_table for _, model in SUMMARY_MODELS
+        if estimates.get(model._meta.db_table, -1) < 0
+    ]
+    if missing:
+        cursor.execute(
+            " UNION ALL ".join(
+                f"SELECT %s, COUNT(*) FROM {connection.ops.quote_name(table)}"
+                for table in missing
+            ),
+            missing
+        )
+        estimates.update(cursor.fetchall())
+
+
+def report():
+    print("=" * 50)
+    print("DATABASE SUMMARY (approximate)")
+    print("=" * 50)
+    for label, model in SUMMARY_MODELS:
+        print(f"{label}: {estimates[model._meta.db_table]:,}")
+
+    print("\n" + "=" * 50)
+    print("HEALTH RECORDS BY TYPE")
+    print("=" * 50)
+    # Trigger-maintained per-metric counts; no scan of HealthRecord
+    metric_counts = HealthRecordCount.objects.values_list('metric_type', 'count')
+    for metric_type, count in metric_counts:
+        print(f"  {metric_type}: {count:,}")
+
+    print("\n" + "=" * 50)
+    print("SAMPLE DAILY SUMMARY (Dec 20, 2025)")
+    print("=" * 50)
+    from datetime import date
+    ds = DailySummary.objects.filter(date=date(2025, 12, 20)).only(
+        'date',
+        'calories', 'protein_g', 'protein_pct', 'carbs_g', 'carbs_pct', 'fat_g', 'fat_pct',
+        'sleep_duration_min', 'deep_sleep_min', 'rem_sleep_min', 'light_sleep_min', 'sleep_score',
+        'steps', 'distance_km',
+        'resting_hr', 'hrv_rmssd', 'readiness_score',
+        'data_completeness',
+    ).first()
+    if ds:
+        print(f"Date: {ds.date}")
+        print(f"  NUTRITION:")
+        print(f"    Calories: {ds.calories} kcal")
+        print(f"    Protein: {ds.protein_g}g ({ds.protein_pct}%)")
+        print(f"    Carbs: {ds.carbs_g}g ({ds.carbs_pct}%)")
+        print(f"    Fat: {ds.fat_g}g ({ds.fat_pct}%)")
+        print(f"  SLEEP:")
+        print(f"    Duration: {ds.sleep_duration_min} min")
+        print(f"    Deep: {ds.deep_sleep_min} min")
+        print(f"    REM: {ds.rem_sleep_min} min")
+        print(f"    Light: {ds.light_sleep_min} min")
+        print(f"    Score: {ds.sleep_score}")
+        print(f"  ACTIVITY:")
+        print(f"    Steps: {ds.steps:,}" if ds.steps else "    Steps: None")
+        print(f"    Distance: {ds.distance_km} km")
+        print(f"  VITALS:")
+        print(f"    Resting HR: {ds.resting_hr} bpm")
+        print(f"    HRV: {ds.hrv_rmssd}")
+        print(f"    Readiness: {ds.readiness_score}")
+        print(f"  Completeness: {ds.data_completeness}%")
+    else:
+        print("No data for this date")
+
+    print("\n" + "=" * 50)
+    print("30-DAY AVERAGES")
+    print("=" * 50)
+    from core.services import InsightsService
+    avgs = InsightsService.get_averages(days=30)
+    for key, val in avgs.items():
+        if val:
+            print(f"  {key}: {val:.1f}")
+
+
+# Collect the report and write it out in one go rather than once per line
+buffer = io.StringIO()
+with contextlib.redirect_stdout(buffer):
+    report()
+sys.stdout.write(buffer.getvalue())
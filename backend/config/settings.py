@@ -91,6 +91,23 @@ DATABASES = {
         'PASSWORD': os.environ.get("POSTGRES_PASSWORD", "health_password"),
         'HOST': os.environ.get("POSTGRES_HOST", "db"),
         'PORT': os.environ.get("POSTGRES_PORT", "5432"),
+        # Reuse each worker's connection across requests rather than
+        # reconnecting per request; stale ones are checked and replaced
+        'CONN_MAX_AGE': int(os.environ.get("POSTGRES_CONN_MAX_AGE", "60")),
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+# Kept in Postgres so web workers and management commands share one cache;
+# imports invalidate cached stats that the API serves
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
     }
 }
 
@@ -143,6 +160,10 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Ingestion
+# Keep each Fitbit source row on its record as raw_data, for auditing
+FITBIT_STORE_RAW = os.environ.get("FITBIT_STORE_RAW", "False") == "True"
+
 # CORS Configuration
 CORS_ALLOW_ALL_ORIGINS = True  # For development only
 
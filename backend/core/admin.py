@@ -1,44 +1,87 @@
 from django.contrib import admin
+
+from ingestion.services import RecordStatsCache
 from .models import HealthRecord, SleepLog, NutritionLog, BloodworkResult, DataImportLog
 
 
+class ChangelistDeferMixin:
+    """
+    Skip large JSON columns when loading the changelist.
+    
+    The changelist only renders list_display, so pulling raw_data/metadata
+    blobs for every row is wasted work. Change forms still load full rows
+    (deferring there would cost one extra query per deferred field).
+    """
+    changelist_defer: tuple[str, ...] = ()
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if self.changelist_defer and match and match.url_name.endswith('_changelist'):
+            queryset = queryset.defer(*self.changelist_defer)
+        return queryset
+
+
+class StatsInvalidatingMixin:
+    """Invalidate the API's cached stats for the table after admin writes."""
+    stats_name: str
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        RecordStatsCache.invalidate(self.stats_name)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        RecordStatsCache.invalidate(self.stats_name)
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        RecordStatsCache.invalidate(self.stats_name)
+
+
 @admin.register(HealthRecord)
-class HealthRecordAdmin(admin.ModelAdmin):
+class HealthRecordAdmin(StatsInvalidatingMixin, ChangelistDeferMixin, admin.ModelAdmin):
     list_display = ('metric_type', 'value', 'unit', 'timestamp', 'source', 'date')
     list_filter = ('metric_type', 'source', 'date')
-    search_fields = ('metric_type', 'source')
+    search_fields = ('metric_type',)
     date_hierarchy = 'timestamp'
-    readonly_fields = ('created_at', 'import_batch_id')
+    readonly_fields = ('created_at', 'import_batch_id', 'raw_data')
+    changelist_defer = ('raw_data', 'metadata')
+    stats_name = 'health_records'
 
 
 @admin.register(SleepLog)
-class SleepLogAdmin(admin.ModelAdmin):
+class SleepLogAdmin(ChangelistDeferMixin, admin.ModelAdmin):
     list_display = ('date_of_sleep', 'duration_minutes', 'deep_sleep_minutes', 'efficiency', 'source')
     list_filter = ('source', 'date_of_sleep')
     date_hierarchy = 'date_of_sleep'
-    readonly_fields = ('created_at', 'import_batch_id')
+    readonly_fields = ('created_at', 'import_batch_id', 'raw_data')
+    changelist_defer = ('stages_data', 'raw_data')
 
 
 @admin.register(NutritionLog)
-class NutritionLogAdmin(admin.ModelAdmin):
+class NutritionLogAdmin(ChangelistDeferMixin, admin.ModelAdmin):
     list_display = ('date', 'calories', 'protein_g', 'carbs_g', 'fat_g', 'source')
     list_filter = ('source', 'date')
     date_hierarchy = 'date'
-    readonly_fields = ('created_at', 'import_batch_id')
+    readonly_fields = ('created_at', 'import_batch_id', 'raw_data')
+    changelist_defer = ('micronutrients', 'raw_data')
 
 
 @admin.register(BloodworkResult)
-class BloodworkResultAdmin(admin.ModelAdmin):
+class BloodworkResultAdmin(StatsInvalidatingMixin, admin.ModelAdmin):
     list_display = ('biomarker', 'value', 'unit', 'test_date', 'is_flagged', 'flag_type')
     list_filter = ('biomarker', 'is_flagged', 'test_date')
     search_fields = ('biomarker', 'lab_name')
     date_hierarchy = 'test_date'
     readonly_fields = ('created_at',)
+    stats_name = 'bloodwork'
 
 
 @admin.register(DataImportLog)
-class DataImportLogAdmin(admin.ModelAdmin):
+class DataImportLogAdmin(ChangelistDeferMixin, admin.ModelAdmin):
     list_display = ('batch_id', 'source', 'status', 'records_created', 'records_skipped', 'started_at')
     list_filter = ('source', 'status', 'started_at')
     readonly_fields = ('batch_id', 'started_at', 'completed_at')
+    changelist_defer = ('errors',)
 
@@ -0,0 +1,37 @@
+"""
+Helpers for caching derived data across processes.
+
+Cached entries are keyed on a generation that writers bump, so
+invalidating never has to enumerate keys. That only works when the web
+workers and management commands all see the same cache.
+"""
+
+from time import time_ns
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def is_shared() -> bool:
+    """Whether the default cache is visible to every process."""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def get_generation(key: str) -> int:
+    """
+    Current generation stored under key.
+
+    Missing generations (never set, or culled by the backend) start from
+    the clock rather than 0, so they can't repeat a value that entries or
+    ETags were already issued under.
+    """
+    return cache.get_or_set(key, time_ns, None)
+
+
+def bump_generation(key: str):
+    """Move key to a new generation, orphaning entries under the old one."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time_ns(), None)
@@ -0,0 +1,67 @@
+"""
+Management command to rebuild DailySummary rows from the source data.
+
+Usage:
+    python manage.py rebuild_summaries
+    python manage.py rebuild_summaries --user alice
+    python manage.py rebuild_summaries --workers 4
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.services import DailySummaryService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild daily summaries for every user (or one user)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=str,
+            help='Username to rebuild (default: all users, plus data with no owner)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=min(8, os.cpu_count() or 1),
+            help='Users rebuilt concurrently'
+        )
+
+    def handle(self, *args, **options):
+        username = options.get('user')
+        workers = max(1, options['workers'])
+        
+        if username:
+            try:
+                users = [User.objects.get(username=username)]
+            except User.DoesNotExist:
+                raise CommandError(f"User does not exist: {username}")
+        else:
+            # CLI imports are stored without a user
+            users = [None, *User.objects.all()]
+        
+        # Users don't share summaries, so each rebuild runs on its own
+        # thread; the work is database-bound, so the GIL isn't in the way
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(self._rebuild, users))
+        
+        for user, count in zip(users, results):
+            name = user.username if user else '(no user)'
+            self.stdout.write(f"  {name}: {count} days")
+        self.stdout.write(self.style.SUCCESS(
+            f"\nRebuilt {sum(results)} summaries for {len(users)} user(s)"
+        ))
+    
+    @staticmethod
+    def _rebuild(user: User | None) -> int:
+        try:
+            return DailySummaryService.rebuild_all(user)
+        finally:
+            # Connections are per thread; don't leave the worker's open
+            connections.close_all()
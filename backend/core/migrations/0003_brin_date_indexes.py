@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-15 06:54
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_add_daily_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='dailysummary',
+            name='core_dailys_date_62de1e_idx',
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='date',
+            field=models.DateField(),
+        ),
+        migrations.AlterField(
+            model_name='healthrecord',
+            name='timestamp',
+            field=models.DateTimeField(),
+        ),
+        migrations.AlterField(
+            model_name='nutritionlog',
+            name='date',
+            field=models.DateField(),
+        ),
+        migrations.AlterField(
+            model_name='sleeplog',
+            name='date_of_sleep',
+            field=models.DateField(),
+        ),
+        migrations.AddIndex(
+            model_name='dailysummary',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['date'], name='ds_date_brin', pages_per_range=32),
+        ),
+        migrations.AddIndex(
+            model_name='healthrecord',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['timestamp'], name='hr_ts_brin', pages_per_range=32),
+        ),
+        migrations.AddIndex(
+            model_name='nutritionlog',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['date'], name='nutrition_date_brin', pages_per_range=32),
+        ),
+        migrations.AddIndex(
+            model_name='sleeplog',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['date_of_sleep'], name='sleep_date_brin', pages_per_range=32),
+        ),
+    ]
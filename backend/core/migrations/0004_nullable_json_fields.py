@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-15 06:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_brin_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dataimportlog',
+            name='errors',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='healthrecord',
+            name='metadata',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='nutritionlog',
+            name='micronutrients',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
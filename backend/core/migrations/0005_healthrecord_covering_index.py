@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-15 06:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_nullable_json_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='healthrecord',
+            name='core_health_metric__0842db_idx',
+        ),
+        migrations.AddIndex(
+            model_name='healthrecord',
+            index=models.Index(fields=['metric_type', 'date'], include=('value',), name='hr_metric_date_cov'),
+        ),
+    ]
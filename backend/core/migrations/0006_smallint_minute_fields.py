@@ -0,0 +1,138 @@
+# Generated by Django 5.2.18 on 2026-10-15 06:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_healthrecord_covering_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='active_zone_minutes',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='data_completeness',
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='deep_sleep_min',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='light_sleep_min',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='lightly_active_minutes',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='moderately_active_minutes',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='readiness_score',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='rem_sleep_min',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='resting_hr',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='sedentary_minutes',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='sleep_duration_min',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='sleep_efficiency',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='sleep_minutes_asleep',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='sleep_minutes_awake',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='sleep_score',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='stress_score',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailysummary',
+            name='very_active_minutes',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='sleeplog',
+            name='deep_sleep_minutes',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='sleeplog',
+            name='duration_minutes',
+            field=models.SmallIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='sleeplog',
+            name='efficiency',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='sleeplog',
+            name='light_sleep_minutes',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='sleeplog',
+            name='minutes_asleep',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='sleeplog',
+            name='minutes_awake',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='sleeplog',
+            name='rem_sleep_minutes',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='sleeplog',
+            name='sleep_score',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-15 06:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_smallint_minute_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='healthrecord',
+            index=models.Index(condition=models.Q(('date__isnull', False)), fields=['user', 'date', 'metric_type'], name='hr_user_date_metric_partial'),
+        ),
+    ]
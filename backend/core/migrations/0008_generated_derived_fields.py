@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-15 07:02
+
+import django.db.models.expressions
+import django.db.models.functions.math
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_healthrecord_daily_partial_index'),
+    ]
+
+    # Postgres can't turn an existing column into a generated one, so the
+    # derived columns are dropped and re-added as GENERATED ALWAYS ... STORED
+    operations = [
+        migrations.RemoveField(
+            model_name='dailysummary',
+            name='carbs_pct',
+        ),
+        migrations.AddField(
+            model_name='dailysummary',
+            name='carbs_pct',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(models.Q(('calories__gt', 0), ('carbs_g__gt', 0)), then=django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('carbs_g'), '*', models.Value(4)), '/', models.F('calories')), '*', models.Value(100)), 1)), output_field=models.FloatField()), output_field=models.FloatField()),
+        ),
+        migrations.RemoveField(
+            model_name='dailysummary',
+            name='data_completeness',
+        ),
+        migrations.AddField(
+            model_name='dailysummary',
+            name='data_completeness',
+            field=models.GeneratedField(db_persist=True, expression=models.ExpressionWrapper(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.Value(0), '+', models.Case(models.When(calories__isnull=False, then=models.Value(1)), default=models.Value(0))), '+', models.Case(models.When(steps__isnull=False, then=models.Value(1)), default=models.Value(0))), '+', models.Case(models.When(sleep_duration_min__isnull=False, then=models.Value(1)), default=models.Value(0))), '+', models.Case(models.When(resting_hr__isnull=False, then=models.Value(1)), default=models.Value(0))), '+', models.Case(models.When(hrv_rmssd__isnull=False, then=models.Value(1)), default=models.Value(0))), '+', models.Case(models.When(sleep_score__isnull=False, then=models.Value(1)), default=models.Value(0))), '*', models.Value(100)), '/', models.Value(6)), output_field=models.SmallIntegerField()), output_field=models.SmallIntegerField()),
+        ),
+        migrations.RemoveField(
+            model_name='dailysummary',
+            name='fat_pct',
+        ),
+        migrations.AddField(
+            model_name='dailysummary',
+            name='fat_pct',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(models.Q(('calories__gt', 0), ('fat_g__gt', 0)), then=django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('fat_g'), '*', models.Value(9)), '/', models.F('calories')), '*', models.Value(100)), 1)), output_field=models.FloatField()), output_field=models.FloatField()),
+        ),
+        migrations.RemoveField(
+            model_name='dailysummary',
+            name='protein_pct',
+        ),
+        migrations.AddField(
+            model_name='dailysummary',
+            name='protein_pct',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(models.Q(('calories__gt', 0), ('protein_g__gt', 0)), then=django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('protein_g'), '*', models.Value(4)), '/', models.F('calories')), '*', models.Value(100)), 1)), output_field=models.FloatField()), output_field=models.FloatField()),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-15 07:02
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_generated_derived_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='healthrecord',
+            name='import_batch_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='healthrecord',
+            index=django.contrib.postgres.indexes.HashIndex(fields=['import_batch_id'], name='hr_batch_hash'),
+        ),
+        migrations.AddIndex(
+            model_name='nutritionlog',
+            index=django.contrib.postgres.indexes.HashIndex(fields=['import_batch_id'], name='nutrition_batch_hash'),
+        ),
+        migrations.AddIndex(
+            model_name='sleeplog',
+            index=django.contrib.postgres.indexes.HashIndex(fields=['import_batch_id'], name='sleep_batch_hash'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-15 07:03
+
+import core.models
+from django.db import migrations
+
+# Codes from core.models.DATA_SOURCE_CODES at the time of this migration
+SOURCE_CODES = {
+    'unknown': 0,
+    'fitbit': 1,
+    'garmin': 2,
+    'oura': 3,
+    'apple_health': 4,
+    'cronometer': 5,
+    'myfitnesspal': 6,
+    'manual': 7,
+}
+TABLES = ('core_dataimportlog', 'core_healthrecord', 'core_nutritionlog', 'core_sleeplog')
+
+
+def _recode_sql(mapping):
+    cases = ' '.join(f"WHEN '{old}' THEN '{new}'" for old, new in mapping.items())
+    return [f'UPDATE {table} SET source = CASE source {cases} ELSE source END' for table in TABLES]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_import_batch_hash_indexes'),
+    ]
+
+    # Rewrite names as their code digits first so the column type change
+    # can cast them straight to smallint (and the reverse after casting back)
+    operations = [
+        migrations.RunSQL(
+            _recode_sql({name: str(code) for name, code in SOURCE_CODES.items()}),
+            reverse_sql=_recode_sql({str(code): name for name, code in SOURCE_CODES.items()}),
+        ),
+        migrations.AlterField(
+            model_name='dataimportlog',
+            name='source',
+            field=core.models.DataSourceField(choices=[('fitbit', 'Fitbit'), ('garmin', 'Garmin'), ('oura', 'Oura'), ('apple_health', 'Apple Health'), ('cronometer', 'Cronometer'), ('myfitnesspal', 'MyFitnessPal'), ('manual', 'Manual Entry')]),
+        ),
+        migrations.AlterField(
+            model_name='healthrecord',
+            name='source',
+            field=core.models.DataSourceField(choices=[('fitbit', 'Fitbit'), ('garmin', 'Garmin'), ('oura', 'Oura'), ('apple_health', 'Apple Health'), ('cronometer', 'Cronometer'), ('myfitnesspal', 'MyFitnessPal'), ('manual', 'Manual Entry')], db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='nutritionlog',
+            name='source',
+            field=core.models.DataSourceField(choices=[('fitbit', 'Fitbit'), ('garmin', 'Garmin'), ('oura', 'Oura'), ('apple_health', 'Apple Health'), ('cronometer', 'Cronometer'), ('myfitnesspal', 'MyFitnessPal'), ('manual', 'Manual Entry')]),
+        ),
+        migrations.AlterField(
+            model_name='sleeplog',
+            name='source',
+            field=core.models.DataSourceField(choices=[('fitbit', 'Fitbit'), ('garmin', 'Garmin'), ('oura', 'Oura'), ('apple_health', 'Apple Health'), ('cronometer', 'Cronometer'), ('myfitnesspal', 'MyFitnessPal'), ('manual', 'Manual Entry')]),
+        ),
+    ]
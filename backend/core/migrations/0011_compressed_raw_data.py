@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-15 07:05
+
+import core.models
+from django.db import migrations
+
+MODELS = ('healthrecord', 'sleeplog', 'nutritionlog')
+
+
+def _copy(apps, from_field, to_field):
+    for model_name in MODELS:
+        model = apps.get_model('core', model_name)
+        batch = []
+        rows = model.objects.exclude(**{f'{from_field}__isnull': True}).only(from_field)
+        for obj in rows.iterator(chunk_size=2000):
+            setattr(obj, to_field, getattr(obj, from_field))
+            batch.append(obj)
+            if len(batch) >= 2000:
+                model.objects.bulk_update(batch, [to_field])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, [to_field])
+
+
+def compress_raw_data(apps, schema_editor):
+    _copy(apps, 'raw_data_json', 'raw_data')
+
+
+def decompress_raw_data(apps, schema_editor):
+    _copy(apps, 'raw_data', 'raw_data_json')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_smallint_source'),
+    ]
+
+    # jsonb can't be cast to compressed bytes in SQL, so the old column is
+    # kept aside while rows are re-encoded in Python, then dropped
+    operations = [
+        *(
+            migrations.RenameField(model_name=name, old_name='raw_data', new_name='raw_data_json')
+            for name in MODELS
+        ),
+        *(
+            migrations.AddField(
+                model_name=name,
+                name='raw_data',
+                field=core.models.CompressedJSONField(blank=True, null=True),
+            )
+            for name in MODELS
+        ),
+        migrations.RunPython(compress_raw_data, decompress_raw_data),
+        *(
+            migrations.RemoveField(model_name=name, name='raw_data_json')
+            for name in MODELS
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-15 07:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_compressed_raw_data'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='dailysummary',
+            constraint=models.CheckConstraint(condition=models.Q(('calories__gte', 0), ('calories__isnull', True), _connector='OR'), name='ds_calories_nonneg'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailysummary',
+            constraint=models.CheckConstraint(condition=models.Q(('protein_g__gte', 0), ('protein_g__isnull', True), _connector='OR'), name='ds_protein_g_nonneg'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailysummary',
+            constraint=models.CheckConstraint(condition=models.Q(('carbs_g__gte', 0), ('carbs_g__isnull', True), _connector='OR'), name='ds_carbs_g_nonneg'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailysummary',
+            constraint=models.CheckConstraint(condition=models.Q(('fat_g__gte', 0), ('fat_g__isnull', True), _connector='OR'), name='ds_fat_g_nonneg'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailysummary',
+            constraint=models.CheckConstraint(condition=models.Q(('fiber_g__gte', 0), ('fiber_g__isnull', True), _connector='OR'), name='ds_fiber_g_nonneg'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailysummary',
+            constraint=models.CheckConstraint(condition=models.Q(('sodium_mg__gte', 0), ('sodium_mg__isnull', True), _connector='OR'), name='ds_sodium_mg_nonneg'),
+        ),
+    ]
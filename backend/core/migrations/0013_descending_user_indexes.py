@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-15 07:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_dailysummary_nonneg_checks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='dailysummary',
+            name='core_dailys_user_id_830719_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='healthrecord',
+            name='core_health_user_id_fd1344_idx',
+        ),
+        migrations.AddIndex(
+            model_name='dailysummary',
+            index=models.Index(fields=['user', '-date'], name='ds_user_date_desc'),
+        ),
+        migrations.AddIndex(
+            model_name='healthrecord',
+            index=models.Index(fields=['user', 'metric_type', '-timestamp'], name='hr_user_metric_ts_desc'),
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.18 on 2026-10-15 07:06
+
+from django.db import migrations, models
+
+ADD_ROWS = """
+    INSERT INTO core_healthrecordcount AS c (metric_type, count)
+    SELECT metric_type, COUNT(*) FROM new_rows GROUP BY metric_type
+    ON CONFLICT (metric_type) DO UPDATE SET count = c.count + EXCLUDED.count;
+"""
+
+REMOVE_ROWS = """
+    UPDATE core_healthrecordcount AS c SET count = c.count - d.n
+    FROM (SELECT metric_type, COUNT(*) AS n FROM old_rows GROUP BY metric_type) AS d
+    WHERE c.metric_type = d.metric_type;
+    DELETE FROM core_healthrecordcount WHERE count <= 0;
+"""
+
+
+def _function(name, body):
+    return f"""
+        CREATE FUNCTION {name}() RETURNS trigger AS $$
+        BEGIN
+            {body}
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+    """
+
+
+CREATE_SQL = [
+    """
+    CREATE TABLE core_healthrecordcount (
+        metric_type varchar(50) PRIMARY KEY,
+        count bigint NOT NULL
+    );
+    """,
+    """
+    INSERT INTO core_healthrecordcount (metric_type, count)
+    SELECT metric_type, COUNT(*) FROM core_healthrecord GROUP BY metric_type;
+    """,
+    _function('core_healthrecordcount_insert', ADD_ROWS),
+    _function('core_healthrecordcount_delete', REMOVE_ROWS),
+    _function('core_healthrecordcount_update', REMOVE_ROWS + ADD_ROWS),
+    _function('core_healthrecordcount_truncate', 'DELETE FROM core_healthrecordcount;'),
+    # Transition tables need one trigger per event
+    """
+    CREATE TRIGGER core_healthrecordcount_insert
+    AFTER INSERT ON core_healthrecord REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_healthrecordcount_insert();
+    """,
+    """
+    CREATE TRIGGER core_healthrecordcount_delete
+    AFTER DELETE ON core_healthrecord REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_healthrecordcount_delete();
+    """,
+    """
+    CREATE TRIGGER core_healthrecordcount_update
+    AFTER UPDATE ON core_healthrecord REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_healthrecordcount_update();
+    """,
+    """
+    CREATE TRIGGER core_healthrecordcount_truncate
+    AFTER TRUNCATE ON core_healthrecord
+    FOR EACH STATEMENT EXECUTE FUNCTION core_healthrecordcount_truncate();
+    """,
+]
+
+DROP_SQL = [
+    *(
+        f"DROP TRIGGER core_healthrecordcount_{event} ON core_healthrecord;"
+        f"DROP FUNCTION core_healthrecordcount_{event}();"
+        for event in ('insert', 'delete', 'update', 'truncate')
+    ),
+    "DROP TABLE core_healthrecordcount;",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_descending_user_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HealthRecordCount',
+            fields=[
+                ('metric_type', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('count', models.BigIntegerField()),
+            ],
+            options={
+                'db_table': 'core_healthrecordcount',
+                'ordering': ['-count'],
+                'managed': False,
+            },
+        ),
+        migrations.RunSQL(CREATE_SQL, reverse_sql=DROP_SQL),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-15 07:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_healthrecord_counts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='healthrecord',
+            name='hr_user_date_metric_partial',
+        ),
+        migrations.AddIndex(
+            model_name='healthrecord',
+            index=models.Index(condition=models.Q(('date__isnull', False)), fields=['user', 'date', 'metric_type'], include=('value', 'timestamp'), name='hr_user_date_metric_cov'),
+        ),
+    ]
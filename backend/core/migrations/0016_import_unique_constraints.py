@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-15 07:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Rows get_or_create let through under concurrent imports; keep the oldest
+DEDUPLICATE_SQL = [
+    """
+    DELETE FROM core_healthrecord a USING core_healthrecord b
+    WHERE a.id > b.id
+      AND a.user_id IS NOT DISTINCT FROM b.user_id
+      AND a.source = b.source
+      AND a.metric_type = b.metric_type
+      AND a.timestamp = b.timestamp;
+    """,
+    """
+    DELETE FROM core_sleeplog a USING core_sleeplog b
+    WHERE a.id > b.id
+      AND a.user_id IS NOT DISTINCT FROM b.user_id
+      AND a.source = b.source
+      AND a.source_log_id = b.source_log_id;
+    """,
+    """
+    DELETE FROM core_nutritionlog a USING core_nutritionlog b
+    WHERE a.id > b.id
+      AND a.user_id IS NOT DISTINCT FROM b.user_id
+      AND a.source = b.source
+      AND a.date = b.date;
+    """,
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_healthrecord_daily_covering_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunSQL(DEDUPLICATE_SQL, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='healthrecord',
+            constraint=models.UniqueConstraint(fields=('user', 'source', 'metric_type', 'timestamp'), name='hr_unique_reading', nulls_distinct=False),
+        ),
+        migrations.AddConstraint(
+            model_name='nutritionlog',
+            constraint=models.UniqueConstraint(fields=('user', 'source', 'date'), name='nutrition_unique_day', nulls_distinct=False),
+        ),
+        migrations.AddConstraint(
+            model_name='sleeplog',
+            constraint=models.UniqueConstraint(fields=('user', 'source', 'source_log_id'), name='sleep_unique_source_log', nulls_distinct=False),
+        ),
+    ]
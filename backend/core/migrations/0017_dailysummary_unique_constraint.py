@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-15 07:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+# unique_together treated NULL users as distinct, so user=None summaries
+# could repeat a date; keep the oldest
+DEDUPLICATE_SQL = """
+    DELETE FROM core_dailysummary a USING core_dailysummary b
+    WHERE a.id > b.id
+      AND a.user_id IS NULL
+      AND b.user_id IS NULL
+      AND a.date = b.date;
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_import_unique_constraints'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunSQL(DEDUPLICATE_SQL, migrations.RunSQL.noop),
+        migrations.AlterUniqueTogether(
+            name='dailysummary',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='dailysummary',
+            constraint=models.UniqueConstraint(fields=('user', 'date'), name='ds_unique_user_date', nulls_distinct=False),
+        ),
+    ]
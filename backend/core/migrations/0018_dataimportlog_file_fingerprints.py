@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-15 07:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_dailysummary_unique_constraint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataimportlog',
+            name='file_fingerprints',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
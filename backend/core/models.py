@@ -1,4 +1,10 @@
+import json
+import zlib
+
+from django.contrib.postgres.indexes import BrinIndex, HashIndex
 from django.db import models
+from django.db.models.functions import Round
+from django.utils.functional import cached_property
 from django.contrib.auth.models import User
 
 
@@ -13,6 +19,95 @@ class DataSource(models.TextChoices):
     MANUAL = 'manual', 'Manual Entry'
 
 
+# Smallint code stored for each source. Codes are persisted, so never
+# renumber; 'unknown' marks imports whose source hasn't been detected yet.
+DATA_SOURCE_CODES = {
+    'unknown': 0,
+    DataSource.FITBIT: 1,
+    DataSource.GARMIN: 2,
+    DataSource.OURA: 3,
+    DataSource.APPLE_HEALTH: 4,
+    DataSource.CRONOMETER: 5,
+    DataSource.MYFITNESSPAL: 6,
+    DataSource.MANUAL: 7,
+}
+DATA_SOURCE_NAMES = {code: str(name) for name, code in DATA_SOURCE_CODES.items()}
+
+
+class DataSourceField(models.SmallIntegerField):
+    """
+    Stores a DataSource as a 2-byte code instead of a varchar.
+    
+    Python code, queries and the API keep using the source names
+    ('fitbit', ...); only the column holds the integer code.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('choices', DataSource.choices)
+        super().__init__(*args, **kwargs)
+    
+    @cached_property
+    def validators(self):
+        # Values are source names checked against choices; skip the
+        # integer range validators SmallIntegerField would add
+        return [*self.default_validators, *self._validators]
+    
+    def from_db_value(self, value, expression, connection):
+        return DATA_SOURCE_NAMES.get(value, value)
+    
+    def to_python(self, value):
+        if value is None or isinstance(value, str):
+            return value
+        return DATA_SOURCE_NAMES.get(value, value)
+    
+    def get_prep_value(self, value):
+        if isinstance(value, str):
+            # Unrecognised names match nothing rather than erroring
+            return DATA_SOURCE_CODES.get(value)
+        return super().get_prep_value(value)
+    
+    def get_db_prep_save(self, value, connection):
+        # Saving one is a bug, though; name it rather than letting it
+        # surface as a NOT NULL violation
+        if isinstance(value, str) and value not in DATA_SOURCE_CODES:
+            raise ValueError(
+                f"Unknown data source {value!r} for "
+                f"{self.model.__name__}.{self.name}"
+            )
+        return super().get_db_prep_save(value, connection)
+
+
+class CompressedJSONField(models.BinaryField):
+    """
+    Audit-only JSON stored as zlib-compressed bytes.
+    
+    Never filtered on, so it doesn't need to be jsonb. Every loaded row is
+    still decompressed and parsed, so querysets that don't need the blob
+    should defer() it.
+    """
+    
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return json.loads(zlib.decompress(value))
+    
+    def to_python(self, value):
+        # Serialized fixtures carry the JSON text from value_to_string()
+        if isinstance(value, str):
+            return json.loads(value)
+        if isinstance(value, (bytes, memoryview)):
+            return json.loads(zlib.decompress(value))
+        return value
+    
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        return zlib.compress(json.dumps(value).encode())
+    
+    def value_to_string(self, obj):
+        return json.dumps(self.value_from_object(obj))
+
+
 class MetricType(models.TextChoices):
     """Standardized metric types across all sources."""
     # Activity
@@ -60,11 +155,7 @@ class HealthRecord(models.Model):
     )
     
     # Source tracking
-    source = models.CharField(
-        max_length=50, 
-        choices=DataSource.choices,
-        db_index=True
-    )
+    source = DataSourceField(db_index=True)
     
     # The standardized metric type
     metric_type = models.CharField(
@@ -78,26 +169,54 @@ class HealthRecord(models.Model):
     unit = models.CharField(max_length=20)
     
     # When this reading was taken (UTC)
-    timestamp = models.DateTimeField(db_index=True)
+    timestamp = models.DateTimeField()
     
     # For daily aggregates (steps, sleep totals, etc.)
     date = models.DateField(null=True, blank=True, db_index=True)
     
     # Store raw original data for debugging/audit
-    raw_data = models.JSONField(null=True, blank=True)
+    raw_data = CompressedJSONField(null=True, blank=True)
     
     # Extra context (e.g., heart_zone, sleep_stage, activity_type)
-    metadata = models.JSONField(default=dict, blank=True)
+    metadata = models.JSONField(null=True, blank=True)
     
     # Import tracking
-    import_batch_id = models.UUIDField(null=True, blank=True, db_index=True)
+    import_batch_id = models.UUIDField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         indexes = [
             models.Index(fields=['source', 'metric_type', 'timestamp']),
-            models.Index(fields=['metric_type', 'date']),
-            models.Index(fields=['user', 'metric_type', 'timestamp']),
+            # Covering index: per-metric aggregates (count/min/max/avg of
+            # value by date) are answered from the index without heap reads
+            models.Index(fields=['metric_type', 'date'], include=['value'], name='hr_metric_date_cov'),
+            # Descending to match ordering = ['-timestamp']
+            models.Index(fields=['user', 'metric_type', '-timestamp'], name='hr_user_metric_ts_desc'),
+            # Daily-aggregate lookups used to build DailySummary; only
+            # daily records carry a date, so the rest are left out. value
+            # and timestamp ride along so the scan can skip the heap
+            # (metadata stays out, JSON can exceed a B-tree entry).
+            models.Index(
+                fields=['user', 'date', 'metric_type'],
+                include=['value', 'timestamp'],
+                condition=models.Q(date__isnull=False),
+                name='hr_user_date_metric_cov',
+            ),
+            # Rows arrive roughly in time order, so a BRIN index covers
+            # timestamp range scans at a fraction of a B-tree's size
+            BrinIndex(fields=['timestamp'], pages_per_range=32, name='hr_ts_brin'),
+            # Batches are only ever looked up by equality
+            HashIndex(fields=['import_batch_id'], name='hr_batch_hash'),
+        ]
+        # One reading per metric and instant; imports insert with
+        # ON CONFLICT DO NOTHING against this. user is nullable, so NULLs
+        # must compare equal for the key to hold.
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'source', 'metric_type', 'timestamp'],
+                nulls_distinct=False,
+                name='hr_unique_reading',
+            ),
         ]
         ordering = ['-timestamp']
 
@@ -105,6 +224,26 @@ class HealthRecord(models.Model):
         return f"{self.metric_type}: {self.value} {self.unit} ({self.timestamp})"
 
 
+class HealthRecordCount(models.Model):
+    """
+    Number of HealthRecords per metric_type.
+    
+    Maintained by statement-level triggers on core_healthrecord (created in
+    the migration alongside this model), so the per-metric breakdown is a
+    lookup on a few rows instead of a full-table GROUP BY.
+    """
+    metric_type = models.CharField(max_length=50, primary_key=True)
+    count = models.BigIntegerField()
+
+    class Meta:
+        managed = False
+        db_table = 'core_healthrecordcount'
+        ordering = ['-count']
+
+    def __str__(self):
+        return f"{self.metric_type}: {self.count}"
+
+
 class SleepLog(models.Model):
     """
     Detailed sleep session data. One record per sleep session.
@@ -118,31 +257,31 @@ class SleepLog(models.Model):
         blank=True
     )
     
-    source = models.CharField(max_length=50, choices=DataSource.choices)
+    source = DataSourceField()
     source_log_id = models.CharField(max_length=100, blank=True)  # Original ID from source
     
-    date_of_sleep = models.DateField(db_index=True)
+    date_of_sleep = models.DateField()
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
     
     # Duration in minutes
-    duration_minutes = models.IntegerField()
-    minutes_asleep = models.IntegerField(null=True, blank=True)
-    minutes_awake = models.IntegerField(null=True, blank=True)
+    duration_minutes = models.SmallIntegerField()
+    minutes_asleep = models.SmallIntegerField(null=True, blank=True)
+    minutes_awake = models.SmallIntegerField(null=True, blank=True)
     
     # Sleep stages in minutes
-    deep_sleep_minutes = models.IntegerField(null=True, blank=True)
-    light_sleep_minutes = models.IntegerField(null=True, blank=True)
-    rem_sleep_minutes = models.IntegerField(null=True, blank=True)
+    deep_sleep_minutes = models.SmallIntegerField(null=True, blank=True)
+    light_sleep_minutes = models.SmallIntegerField(null=True, blank=True)
+    rem_sleep_minutes = models.SmallIntegerField(null=True, blank=True)
     
     # Scores
-    efficiency = models.IntegerField(null=True, blank=True)  # Percentage
-    sleep_score = models.IntegerField(null=True, blank=True)
+    efficiency = models.SmallIntegerField(null=True, blank=True)  # Percentage
+    sleep_score = models.SmallIntegerField(null=True, blank=True)
     
     # Raw stage-by-stage data
     stages_data = models.JSONField(null=True, blank=True)
     
-    raw_data = models.JSONField(null=True, blank=True)
+    raw_data = CompressedJSONField(null=True, blank=True)
     import_batch_id = models.UUIDField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -150,6 +289,15 @@ class SleepLog(models.Model):
         indexes = [
             models.Index(fields=['user', 'date_of_sleep']),
             models.Index(fields=['source', 'source_log_id']),
+            BrinIndex(fields=['date_of_sleep'], pages_per_range=32, name='sleep_date_brin'),
+            HashIndex(fields=['import_batch_id'], name='sleep_batch_hash'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'source', 'source_log_id'],
+                nulls_distinct=False,
+                name='sleep_unique_source_log',
+            ),
         ]
         ordering = ['-date_of_sleep']
 
@@ -169,8 +317,8 @@ class NutritionLog(models.Model):
         blank=True
     )
     
-    source = models.CharField(max_length=50, choices=DataSource.choices)
-    date = models.DateField(db_index=True)
+    source = DataSourceField()
+    date = models.DateField()
     
     # Macronutrients (grams)
     calories = models.FloatField(null=True, blank=True)
@@ -188,7 +336,7 @@ class NutritionLog(models.Model):
     magnesium_mg = models.FloatField(null=True, blank=True)
     
     # Full micronutrient data (varies by source)
-    micronutrients = models.JSONField(default=dict, blank=True)
+    micronutrients = models.JSONField(null=True, blank=True)
     
     # Water intake (ml)
     water_ml = models.FloatField(null=True, blank=True)
@@ -199,13 +347,22 @@ class NutritionLog(models.Model):
     # Caffeine (mg)
     caffeine_mg = models.FloatField(null=True, blank=True)
     
-    raw_data = models.JSONField(null=True, blank=True)
+    raw_data = CompressedJSONField(null=True, blank=True)
     import_batch_id = models.UUIDField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         indexes = [
             models.Index(fields=['user', 'date']),
+            BrinIndex(fields=['date'], pages_per_range=32, name='nutrition_date_brin'),
+            HashIndex(fields=['import_batch_id'], name='nutrition_batch_hash'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'source', 'date'],
+                nulls_distinct=False,
+                name='nutrition_unique_day',
+            ),
         ]
         ordering = ['-date']
 
@@ -262,10 +419,48 @@ class BloodworkResult(models.Model):
         return f"{self.biomarker}: {self.value} {self.unit} ({self.test_date})"
 
 
+def _macro_pct(grams_field: str, kcal_per_gram: int) -> models.GeneratedField:
+    """Share of calories from a macro, rounded to 0.1%; NULL without calories."""
+    return models.GeneratedField(
+        expression=models.Case(
+            models.When(
+                models.Q(calories__gt=0) & models.Q(**{f'{grams_field}__gt': 0}),
+                then=Round(models.F(grams_field) * kcal_per_gram / models.F('calories') * 100, 1),
+            ),
+            output_field=models.FloatField(),
+        ),
+        output_field=models.FloatField(),
+        db_persist=True,
+    )
+
+
+def _completeness(*fields: str) -> models.GeneratedField:
+    """Percentage (0-100) of the given fields that are filled in."""
+    filled = sum(
+        models.Case(
+            models.When(**{f'{f}__isnull': False}, then=models.Value(1)),
+            default=models.Value(0),
+        )
+        for f in fields
+    )
+    return models.GeneratedField(
+        expression=models.ExpressionWrapper(
+            filled * 100 / len(fields),
+            output_field=models.SmallIntegerField(),
+        ),
+        output_field=models.SmallIntegerField(),
+        db_persist=True,
+    )
+
+
 class DailySummary(models.Model):
     """
     Denormalized daily summary combining all health metrics for fast querying.
     One row per day - perfect for trend analysis and insights.
+    
+    Kept as a regular table (maintained by DailySummaryService) rather than a
+    materialized view: a REFRESH recomputes every user's history, while
+    imports only touch a handful of dates that can be rebuilt in place.
     """
     user = models.ForeignKey(
         User,
@@ -275,7 +470,7 @@ class DailySummary(models.Model):
         blank=True
     )
     
-    date = models.DateField(db_index=True)
+    date = models.DateField()
     
     # -------------------------------------------------------------------------
     # Nutrition (from NutritionLog / Cronometer)
@@ -290,14 +485,14 @@ class DailySummary(models.Model):
     # -------------------------------------------------------------------------
     # Sleep (from SleepLog - previous night's sleep)
     # -------------------------------------------------------------------------
-    sleep_duration_min = models.IntegerField(null=True, blank=True)
-    sleep_minutes_asleep = models.IntegerField(null=True, blank=True)
-    sleep_minutes_awake = models.IntegerField(null=True, blank=True)
-    deep_sleep_min = models.IntegerField(null=True, blank=True)
-    light_sleep_min = models.IntegerField(null=True, blank=True)
-    rem_sleep_min = models.IntegerField(null=True, blank=True)
-    sleep_efficiency = models.IntegerField(null=True, blank=True)  # percentage
-    sleep_score = models.IntegerField(null=True, blank=True)
+    sleep_duration_min = models.SmallIntegerField(null=True, blank=True)
+    sleep_minutes_asleep = models.SmallIntegerField(null=True, blank=True)
+    sleep_minutes_awake = models.SmallIntegerField(null=True, blank=True)
+    deep_sleep_min = models.SmallIntegerField(null=True, blank=True)
+    light_sleep_min = models.SmallIntegerField(null=True, blank=True)
+    rem_sleep_min = models.SmallIntegerField(null=True, blank=True)
+    sleep_efficiency = models.SmallIntegerField(null=True, blank=True)  # percentage
+    sleep_score = models.SmallIntegerField(null=True, blank=True)
     sleep_start_time = models.TimeField(null=True, blank=True)
     sleep_end_time = models.TimeField(null=True, blank=True)
     
@@ -306,16 +501,16 @@ class DailySummary(models.Model):
     # -------------------------------------------------------------------------
     steps = models.IntegerField(null=True, blank=True)
     distance_km = models.FloatField(null=True, blank=True)
-    active_zone_minutes = models.IntegerField(null=True, blank=True)
-    very_active_minutes = models.IntegerField(null=True, blank=True)
-    moderately_active_minutes = models.IntegerField(null=True, blank=True)
-    lightly_active_minutes = models.IntegerField(null=True, blank=True)
-    sedentary_minutes = models.IntegerField(null=True, blank=True)
+    active_zone_minutes = models.SmallIntegerField(null=True, blank=True)
+    very_active_minutes = models.SmallIntegerField(null=True, blank=True)
+    moderately_active_minutes = models.SmallIntegerField(null=True, blank=True)
+    lightly_active_minutes = models.SmallIntegerField(null=True, blank=True)
+    sedentary_minutes = models.SmallIntegerField(null=True, blank=True)
     
     # -------------------------------------------------------------------------
     # Vitals (from HealthRecord)
     # -------------------------------------------------------------------------
-    resting_hr = models.IntegerField(null=True, blank=True)  # bpm
+    resting_hr = models.SmallIntegerField(null=True, blank=True)  # bpm
     hrv_rmssd = models.FloatField(null=True, blank=True)  # ms
     hrv_deep_rmssd = models.FloatField(null=True, blank=True)  # during deep sleep
     spo2_avg = models.FloatField(null=True, blank=True)  # percentage
@@ -325,55 +520,54 @@ class DailySummary(models.Model):
     # -------------------------------------------------------------------------
     # Scores (from HealthRecord)
     # -------------------------------------------------------------------------
-    readiness_score = models.IntegerField(null=True, blank=True)
-    stress_score = models.IntegerField(null=True, blank=True)
+    readiness_score = models.SmallIntegerField(null=True, blank=True)
+    stress_score = models.SmallIntegerField(null=True, blank=True)
     
     # -------------------------------------------------------------------------
     # Computed / Derived Fields
     # -------------------------------------------------------------------------
-    # Macro percentages (computed on save)
-    protein_pct = models.FloatField(null=True, blank=True)
-    carbs_pct = models.FloatField(null=True, blank=True)
-    fat_pct = models.FloatField(null=True, blank=True)
+    # Macro percentages (generated by the database)
+    protein_pct = _macro_pct('protein_g', 4)
+    carbs_pct = _macro_pct('carbs_g', 4)
+    fat_pct = _macro_pct('fat_g', 9)
     
     # Data completeness score (0-100)
-    data_completeness = models.IntegerField(default=0)
+    data_completeness = _completeness(
+        'calories', 'steps', 'sleep_duration_min',
+        'resting_hr', 'hrv_rmssd', 'sleep_score',
+    )
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        unique_together = ['user', 'date']
         indexes = [
-            models.Index(fields=['user', 'date']),
-            models.Index(fields=['date']),
+            # Latest-first per user, matching ordering = ['-date']
+            models.Index(fields=['user', '-date'], name='ds_user_date_desc'),
+            BrinIndex(fields=['date'], pages_per_range=32, name='ds_date_brin'),
+        ]
+        constraints = [
+            # One row per user and day, including the shared user=None rows,
+            # so rebuilds can upsert with ON CONFLICT (user_id, date)
+            models.UniqueConstraint(
+                fields=['user', 'date'],
+                name='ds_unique_user_date',
+                nulls_distinct=False,
+            ),
+        ] + [
+            # The generated macro percentages assume non-negative inputs
+            models.CheckConstraint(
+                condition=models.Q(**{f'{field}__gte': 0}) | models.Q(**{f'{field}__isnull': True}),
+                name=f'ds_{field}_nonneg',
+            )
+            for field in ('calories', 'protein_g', 'carbs_g', 'fat_g', 'fiber_g', 'sodium_mg')
         ]
         ordering = ['-date']
 
     def __str__(self):
         return f"Summary {self.date}: {self.steps or 0} steps, {self.calories or 0} kcal"
 
-    def save(self, *args, **kwargs):
-        # Compute macro percentages
-        if self.calories and self.calories > 0:
-            if self.protein_g:
-                self.protein_pct = round((self.protein_g * 4 / self.calories) * 100, 1)
-            if self.carbs_g:
-                self.carbs_pct = round((self.carbs_g * 4 / self.calories) * 100, 1)
-            if self.fat_g:
-                self.fat_pct = round((self.fat_g * 9 / self.calories) * 100, 1)
-        
-        # Compute data completeness
-        fields_to_check = [
-            self.calories, self.steps, self.sleep_duration_min,
-            self.resting_hr, self.hrv_rmssd, self.sleep_score
-        ]
-        filled = sum(1 for f in fields_to_check if f is not None)
-        self.data_completeness = int((filled / len(fields_to_check)) * 100)
-        
-        super().save(*args, **kwargs)
-
 
 class DataImportLog(models.Model):
     """
@@ -388,7 +582,7 @@ class DataImportLog(models.Model):
     )
     
     batch_id = models.UUIDField(unique=True, db_index=True)
-    source = models.CharField(max_length=50, choices=DataSource.choices)
+    source = DataSourceField()
     
     status = models.CharField(
         max_length=20,
@@ -409,7 +603,9 @@ class DataImportLog(models.Model):
     records_processed = models.IntegerField(default=0)
     records_created = models.IntegerField(default=0)
     records_skipped = models.IntegerField(default=0)
-    errors = models.JSONField(default=list, blank=True)
+    errors = models.JSONField(null=True, blank=True)
+    # Fingerprints of files parsed in full, skipped by later re-imports
+    file_fingerprints = models.JSONField(null=True, blank=True)
     
     started_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
@@ -2,22 +2,93 @@
 Core services for data aggregation and insights generation.
 """
 
+import logging
+from collections import defaultdict
 from datetime import date, timedelta
 from typing import Optional
-from django.db.models import Avg, Min, Max, Sum
+
+import numpy as np
+from django.core.cache import cache
+from django.contrib.postgres.aggregates import Corr, RegrCount
+from django.db import DatabaseError, transaction
+from django.db.models import Avg, Count, Min, Max, OuterRef, QuerySet, Subquery, Sum
 from django.contrib.auth.models import User
 
+from .cache import bump_generation, get_generation, is_shared as cache_is_shared
 from .models import (
     DailySummary, HealthRecord, SleepLog, NutritionLog,
     MetricType
 )
 
+logger = logging.getLogger(__name__)
+
+
+def _set_field(field: str, convert=None):
+    """Handler copying a record's value onto one summary field."""
+    def apply(summary: DailySummary, record: dict):
+        value = record['value']
+        setattr(summary, field, convert(value) if convert else value)
+    return apply
+
+
+def _apply_hrv(summary: DailySummary, record: dict):
+    summary.hrv_rmssd = record['value']
+    # Deep sleep HRV rides along in metadata
+    if record['metadata'] and 'deep_rmssd' in record['metadata']:
+        summary.hrv_deep_rmssd = record['metadata']['deep_rmssd']
+
+
+def _apply_spo2(summary: DailySummary, record: dict):
+    summary.spo2_avg = record['value']
+    if record['metadata']:
+        summary.spo2_min = record['metadata'].get('min_value')
+
 
 class DailySummaryService:
     """
     Service to build and update DailySummary records from normalized data.
     """
     
+    # Summaries per INSERT ... ON CONFLICT DO UPDATE statement
+    UPSERT_BATCH_SIZE = 500
+    
+    # NutritionLog fields copied as-is onto the summary
+    NUTRITION_FIELDS = ('calories', 'protein_g', 'carbs_g', 'fat_g', 'fiber_g', 'sodium_mg')
+    
+    # SleepLog field -> DailySummary field
+    SLEEP_FIELDS = {
+        'duration_minutes': 'sleep_duration_min',
+        'minutes_asleep': 'sleep_minutes_asleep',
+        'minutes_awake': 'sleep_minutes_awake',
+        'deep_sleep_minutes': 'deep_sleep_min',
+        'light_sleep_minutes': 'light_sleep_min',
+        'rem_sleep_minutes': 'rem_sleep_min',
+        'efficiency': 'sleep_efficiency',
+        'sleep_score': 'sleep_score',
+    }
+    
+    # HealthRecord metric type -> function applying its latest record
+    METRIC_HANDLERS = {
+        'steps': _set_field('steps', int),
+        'distance': _set_field('distance_km'),
+        'active_zone_minutes': _set_field('active_zone_minutes', int),
+        # Stored as 'resting_heart_rate' from UserSleepScores
+        'resting_heart_rate': _set_field('resting_hr', int),
+        'hrv_rmssd': _apply_hrv,
+        'spo2': _apply_spo2,
+        'skin_temperature': _set_field('skin_temp_deviation'),
+        'readiness_score': _set_field('readiness_score', int),
+        'stress_score': _set_field('stress_score', int),
+        # From HealthRecord, not SleepLog
+        'sleep_score': _set_field('sleep_score', int),
+    }
+    
+    # active_minutes records, keyed by metadata activity_level
+    ACTIVITY_LEVELS = ('very_active', 'moderately_active', 'lightly_active', 'sedentary')
+    
+    # HealthRecord metric types that feed into a summary
+    SUMMARY_METRICS = (*METRIC_HANDLERS, 'active_minutes')
+    
     @classmethod
     def build_summary(
         cls,
@@ -28,21 +99,7 @@ class DailySummaryService:
         Build or update a DailySummary for a specific date.
         Aggregates data from HealthRecord, SleepLog, and NutritionLog.
         """
-        # Get or create the summary
-        summary, created = DailySummary.objects.get_or_create(
-            user=user,
-            date=target_date
-        )
-        
-        # Populate from each data source
-        cls._populate_nutrition(summary, target_date, user)
-        cls._populate_sleep(summary, target_date, user)
-        cls._populate_activity(summary, target_date, user)
-        cls._populate_vitals(summary, target_date, user)
-        cls._populate_scores(summary, target_date, user)
-        
-        summary.save()
-        return summary
+        return cls.build_range(target_date, target_date, user)[0]
     
     @classmethod
     def build_range(
@@ -54,13 +111,28 @@ class DailySummaryService:
         """
         Build summaries for a date range.
         """
-        summaries = []
+        dates = []
         current = start_date
         while current <= end_date:
-            summary = cls.build_summary(current, user)
-            summaries.append(summary)
+            dates.append(current)
             current += timedelta(days=1)
-        return summaries
+        return cls._build_dates(dates, user)
+    
+    @classmethod
+    def build_summaries(
+        cls,
+        dates,
+        user: Optional[User] = None,
+        errors: Optional[list[str]] = None
+    ) -> list[DailySummary]:
+        """
+        Build or update summaries for any collection of dates at once.
+        
+        A day that can't be saved (e.g. a negative nutrition total failing
+        a CHECK constraint) is skipped and reported in errors, if given;
+        the other days are still saved.
+        """
+        return cls._build_dates(sorted(set(dates)), user, errors)
     
     @classmethod
     def rebuild_all(cls, user: Optional[User] = None) -> int:
@@ -68,173 +140,202 @@ class DailySummaryService:
         Rebuild all summaries based on available data.
         Returns count of summaries created/updated.
         """
-        # Find date range from all data sources
-        dates = set()
-        
-        # Get dates from HealthRecords
-        hr_dates = HealthRecord.objects.filter(user=user).values_list('date', flat=True).distinct()
-        dates.update(d for d in hr_dates if d)
+        # Every date with data in any source, deduplicated and sorted by
+        # Postgres in a single UNION query. Each branch drops its model's
+        # default ordering, which would otherwise sort every row first.
+        hr_dates = HealthRecord.objects.filter(
+            user=user, date__isnull=False
+        ).order_by().values_list('date')
+        sleep_dates = SleepLog.objects.filter(
+            user=user, date_of_sleep__isnull=False
+        ).order_by().values_list('date_of_sleep')
+        nutrition_dates = NutritionLog.objects.filter(
+            user=user, date__isnull=False
+        ).order_by().values_list('date')
+        dates = [
+            d for (d,) in hr_dates.union(sleep_dates, nutrition_dates).order_by('date')
+        ]
         
-        # Get dates from SleepLogs
-        sleep_dates = SleepLog.objects.filter(user=user).values_list('date_of_sleep', flat=True).distinct()
-        dates.update(d for d in sleep_dates if d)
-        
-        # Get dates from NutritionLogs
-        nutrition_dates = NutritionLog.objects.filter(user=user).values_list('date', flat=True).distinct()
-        dates.update(d for d in nutrition_dates if d)
-        
-        # Build summary for each date
-        for d in sorted(dates):
-            cls.build_summary(d, user)
+        cls._build_dates(dates, user)
         
         return len(dates)
     
     @classmethod
-    def _populate_nutrition(
-        cls,
-        summary: DailySummary,
-        target_date: date,
-        user: Optional[User]
-    ):
-        """Populate nutrition fields from NutritionLog."""
-        try:
-            nutrition = NutritionLog.objects.get(user=user, date=target_date)
-            summary.calories = nutrition.calories
-            summary.protein_g = nutrition.protein_g
-            summary.carbs_g = nutrition.carbs_g
-            summary.fat_g = nutrition.fat_g
-            summary.fiber_g = nutrition.fiber_g
-            summary.sodium_mg = nutrition.sodium_mg
-        except NutritionLog.DoesNotExist:
-            pass
-    
-    @classmethod
-    def _populate_sleep(
+    def _build_dates(
         cls,
-        summary: DailySummary,
-        target_date: date,
-        user: Optional[User]
-    ):
+        dates: list[date],
+        user: Optional[User],
+        errors: Optional[list[str]] = None
+    ) -> list[DailySummary]:
         """
-        Populate sleep fields from SleepLog.
-        Uses the sleep that ENDED on this date (previous night's sleep).
+        Build summaries for the given (sorted) dates, fetching all source
+        data for the span up front instead of querying per date.
+        Returns the summaries that were saved.
         """
-        try:
-            # Get main sleep for this date
-            sleep = SleepLog.objects.filter(
-                user=user,
-                date_of_sleep=target_date
-            ).order_by('-duration_minutes').first()
+        if not dates:
+            return []
+        
+        bundles = cls._fetch_bulk(dates[0], dates[-1], user)
+        existing = {
+            summary.date: summary
+            for summary in DailySummary.objects.filter(user=user, date__in=dates)
+        }
+        
+        summaries = []
+        for target_date in dates:
+            summary = existing.get(target_date)
+            if summary is None:
+                summary = DailySummary(user=user, date=target_date)
             
-            if sleep:
-                summary.sleep_duration_min = sleep.duration_minutes
-                summary.sleep_minutes_asleep = sleep.minutes_asleep
-                summary.sleep_minutes_awake = sleep.minutes_awake
-                summary.deep_sleep_min = sleep.deep_sleep_minutes
-                summary.light_sleep_min = sleep.light_sleep_minutes
-                summary.rem_sleep_min = sleep.rem_sleep_minutes
-                summary.sleep_efficiency = sleep.efficiency
-                summary.sleep_score = sleep.sleep_score
-                if sleep.start_time:
-                    summary.sleep_start_time = sleep.start_time.time()
-                if sleep.end_time:
-                    summary.sleep_end_time = sleep.end_time.time()
-        except Exception:
-            pass
+            # Populate from each data source
+            bundle = bundles[target_date]
+            cls._populate_nutrition(summary, bundle)
+            cls._populate_sleep(summary, bundle)
+            # After sleep: a HealthRecord sleep_score wins over the SleepLog's
+            cls._populate_records(summary, bundle)
+            summaries.append(summary)
+        
+        # One INSERT ... ON CONFLICT (user, date) DO UPDATE per batch for
+        # new and existing days alike; it also absorbs a day that another
+        # import created since the lookup above
+        created_at = {summary.date: summary.created_at for summary in existing.values()}
+        saved = []
+        for start in range(0, len(summaries), cls.UPSERT_BATCH_SIZE):
+            batch = summaries[start:start + cls.UPSERT_BATCH_SIZE]
+            try:
+                with transaction.atomic():
+                    cls._upsert(batch)
+                saved.extend(batch)
+            except DatabaseError:
+                # Retry one day at a time, so one bad day doesn't lose the
+                # rest of the batch
+                for summary in batch:
+                    try:
+                        with transaction.atomic():
+                            cls._upsert([summary])
+                        saved.append(summary)
+                    except DatabaseError as e:
+                        message = f"Failed to save daily summary for {summary.date}: {e}"
+                        logger.warning(message)
+                        if errors is not None:
+                            errors.append(message)
+        
+        # bulk_create stamps created_at on every row, but the UPDATE
+        # branch leaves the stored value alone. Generated columns need no
+        # fix-up; the upsert returns their new values.
+        for summary in saved:
+            if summary.date in created_at:
+                summary.created_at = created_at[summary.date]
+        
+        InsightsService.invalidate_cache(user)
+        return saved
     
     @classmethod
-    def _populate_activity(
+    def _upsert(cls, summaries: list[DailySummary]):
+        DailySummary.objects.bulk_create(
+            summaries,
+            update_conflicts=True,
+            unique_fields=['user', 'date'],
+            update_fields=cls._update_fields(),
+        )
+    
+    @staticmethod
+    def _update_fields() -> list[str]:
+        """DailySummary fields written when rebuilding an existing summary."""
+        return [
+            field.name for field in DailySummary._meta.concrete_fields
+            if not field.primary_key and not field.generated
+            and field.name not in ('user', 'date', 'created_at')
+        ]
+    
+    @classmethod
+    def _fetch_bulk(
         cls,
-        summary: DailySummary,
-        target_date: date,
+        start_date: date,
+        end_date: date,
         user: Optional[User]
-    ):
-        """Populate activity fields from HealthRecord."""
-        records = HealthRecord.objects.filter(user=user, date=target_date)
+    ) -> defaultdict:
+        """
+        Load the source rows for [start_date, end_date] in one query per
+        model and bucket them by date.
         
-        # Steps
-        steps_record = records.filter(metric_type='steps').first()
-        if steps_record:
-            summary.steps = int(steps_record.value)
+        Each bundle holds the day's nutrition row, main sleep row, the first
+        HealthRecord per metric_type and active minutes per activity level.
+        """
+        bundles = defaultdict(
+            lambda: {'nutrition': None, 'sleep': None, 'records': {}, 'activity': {}}
+        )
+        
+        nutrition_rows = NutritionLog.objects.filter(
+            user=user,
+            date__range=(start_date, end_date)
+        ).values('date', *cls.NUTRITION_FIELDS)
+        for row in nutrition_rows:
+            bundle = bundles[row['date']]
+            if bundle['nutrition'] is None:
+                bundle['nutrition'] = row
         
-        # Distance
-        distance_record = records.filter(metric_type='distance').first()
-        if distance_record:
-            summary.distance_km = distance_record.value
+        # Longest sleep first, so the first row per date is the main sleep
+        sleep_rows = SleepLog.objects.filter(
+            user=user,
+            date_of_sleep__range=(start_date, end_date)
+        ).order_by('date_of_sleep', '-duration_minutes').values(
+            'date_of_sleep', 'start_time', 'end_time', *cls.SLEEP_FIELDS
+        )
+        for row in sleep_rows:
+            bundle = bundles[row['date_of_sleep']]
+            if bundle['sleep'] is None:
+                bundle['sleep'] = row
         
-        # Active Zone Minutes (from AZM records)
-        azm_record = records.filter(metric_type='active_zone_minutes').first()
-        if azm_record:
-            summary.active_zone_minutes = int(azm_record.value)
+        # Latest first, matching HealthRecord's default ordering
+        record_rows = HealthRecord.objects.filter(
+            user=user,
+            date__range=(start_date, end_date),
+            metric_type__in=cls.SUMMARY_METRICS
+        ).order_by('-timestamp').values('date', 'metric_type', 'value', 'metadata')
+        for row in record_rows:
+            bundle = bundles[row['date']]
+            if row['metric_type'] == 'active_minutes':
+                level = (row['metadata'] or {}).get('activity_level')
+                bundle['activity'].setdefault(level, row['value'])
+            else:
+                bundle['records'].setdefault(row['metric_type'], row)
         
-        # Activity breakdown by intensity
-        for level in ['very_active', 'moderately_active', 'lightly_active', 'sedentary']:
-            record = records.filter(
-                metric_type='active_minutes',
-                metadata__activity_level=level
-            ).first()
-            if record:
-                setattr(summary, f'{level}_minutes', int(record.value))
+        return bundles
     
     @classmethod
-    def _populate_vitals(
-        cls,
-        summary: DailySummary,
-        target_date: date,
-        user: Optional[User]
-    ):
-        """Populate vital signs from HealthRecord."""
-        records = HealthRecord.objects.filter(user=user, date=target_date)
-        
-        # Resting Heart Rate (stored as 'resting_heart_rate' from UserSleepScores)
-        rhr_record = records.filter(metric_type='resting_heart_rate').first()
-        if rhr_record:
-            summary.resting_hr = int(rhr_record.value)
-        
-        # HRV (stored as 'hrv_rmssd' in the database)
-        hrv_record = records.filter(metric_type='hrv_rmssd').first()
-        if hrv_record:
-            summary.hrv_rmssd = hrv_record.value
-            # Check for deep sleep HRV in metadata
-            if hrv_record.metadata and 'deep_rmssd' in hrv_record.metadata:
-                summary.hrv_deep_rmssd = hrv_record.metadata['deep_rmssd']
-        
-        # SpO2
-        spo2_record = records.filter(metric_type='spo2').first()
-        if spo2_record:
-            summary.spo2_avg = spo2_record.value
-            if spo2_record.metadata:
-                summary.spo2_min = spo2_record.metadata.get('min_value')
-        
-        # Skin Temperature
-        temp_record = records.filter(metric_type='skin_temperature').first()
-        if temp_record:
-            summary.skin_temp_deviation = temp_record.value
+    def _populate_nutrition(cls, summary: DailySummary, bundle: dict):
+        """Populate nutrition fields from NutritionLog."""
+        nutrition = bundle['nutrition']
+        if nutrition:
+            for field in cls.NUTRITION_FIELDS:
+                setattr(summary, field, nutrition[field])
     
     @classmethod
-    def _populate_scores(
-        cls,
-        summary: DailySummary,
-        target_date: date,
-        user: Optional[User]
-    ):
-        """Populate readiness and stress scores from HealthRecord."""
-        records = HealthRecord.objects.filter(user=user, date=target_date)
-        
-        # Readiness Score
-        readiness_record = records.filter(metric_type='readiness_score').first()
-        if readiness_record:
-            summary.readiness_score = int(readiness_record.value)
-        
-        # Stress Score
-        stress_record = records.filter(metric_type='stress_score').first()
-        if stress_record:
-            summary.stress_score = int(stress_record.value)
-        
-        # Sleep Score (from HealthRecord, not SleepLog)
-        sleep_score_record = records.filter(metric_type='sleep_score').first()
-        if sleep_score_record:
-            summary.sleep_score = int(sleep_score_record.value)
+    def _populate_sleep(cls, summary: DailySummary, bundle: dict):
+        """
+        Populate sleep fields from SleepLog.
+        Uses the sleep that ENDED on this date (previous night's sleep).
+        """
+        sleep = bundle['sleep']
+        if sleep:
+            for log_field, summary_field in cls.SLEEP_FIELDS.items():
+                setattr(summary, summary_field, sleep[log_field])
+            if sleep['start_time']:
+                summary.sleep_start_time = sleep['start_time'].time()
+            if sleep['end_time']:
+                summary.sleep_end_time = sleep['end_time'].time()
+    
+    @classmethod
+    def _populate_records(cls, summary: DailySummary, bundle: dict):
+        """Populate activity, vitals and scores from HealthRecord."""
+        for metric_type, record in bundle['records'].items():
+            cls.METRIC_HANDLERS[metric_type](summary, record)
+        
+        # Activity breakdown by intensity
+        for level, minutes in bundle['activity'].items():
+            if level in cls.ACTIVITY_LEVELS:
+                setattr(summary, f'{level}_minutes', int(minutes))
 
 
 class InsightsService:
@@ -242,6 +343,39 @@ class InsightsService:
     Service to generate insights and correlations from DailySummary data.
     """
     
+    # Aggregates over DailySummary only change when summaries are written,
+    # which bumps the user's cache generation and orphans older entries.
+    # Imports may run in another process, so results are only cached when
+    # the cache backend is shared.
+    CACHE_TIMEOUT = 60 * 60
+    
+    @staticmethod
+    def _generation_key(user: Optional[User]) -> str:
+        return f'insights_gen:{user.pk if user else None}'
+    
+    @classmethod
+    def invalidate_cache(cls, user: Optional[User] = None):
+        """Drop cached insights for a user after their summaries change."""
+        bump_generation(cls._generation_key(user))
+    
+    @classmethod
+    def _cached(cls, user: Optional[User], key: str, compute):
+        """Return compute() through the cache, scoped to the user's generation."""
+        if not cache_is_shared():
+            return compute()
+        generation = get_generation(cls._generation_key(user))
+        return cache.get_or_set(
+            f'{key}:{user.pk if user else None}:{generation}',
+            compute,
+            cls.CACHE_TIMEOUT,
+        )
+    
+    @classmethod
+    def _window(cls, user: Optional[User], days: int) -> tuple[date, QuerySet]:
+        """Cutoff date and the user's summaries for the past N days."""
+        cutoff = date.today() - timedelta(days=days)
+        return cutoff, DailySummary.objects.filter(user=user, date__gte=cutoff)
+    
     @classmethod
     def get_averages(
         cls,
@@ -250,12 +384,18 @@ class InsightsService:
     ) -> dict:
         """
         Get rolling averages for key metrics over the past N days.
+        Results are cached per (user, days, today) until invalidated.
         """
-        cutoff = date.today() - timedelta(days=days)
-        summaries = DailySummary.objects.filter(
-            user=user,
-            date__gte=cutoff
+        today = date.today()
+        return cls._cached(
+            user,
+            f'avg:{days}:{today.isoformat()}',
+            lambda: cls._compute_averages(user, days),
         )
+    
+    @classmethod
+    def _compute_averages(cls, user: Optional[User], days: int) -> dict:
+        _, summaries = cls._window(user, days)
         
         return summaries.aggregate(
             avg_calories=Avg('calories'),
@@ -270,6 +410,17 @@ class InsightsService:
             avg_readiness=Avg('readiness_score'),
         )
     
+    # Fewest paired observations a correlation is reported for
+    MIN_CORRELATION_SAMPLES = 7
+    
+    # name -> (x field, y field); next_day_hrv is annotated per query
+    CORRELATIONS = {
+        'protein_vs_deep_sleep': ('protein_g', 'deep_sleep_min'),
+        'steps_vs_sleep_quality': ('steps', 'sleep_score'),
+        'hrv_vs_readiness': ('hrv_rmssd', 'readiness_score'),
+        'calories_vs_next_day_hrv': ('calories', 'next_day_hrv'),
+    }
+    
     @classmethod
     def get_correlations(
         cls,
@@ -278,38 +429,43 @@ class InsightsService:
     ) -> dict:
         """
         Calculate correlations between metrics.
-        Returns correlation coefficients for key relationships.
+        Returns Pearson correlation coefficients for key relationships,
+        or None where there aren't enough paired observations.
         
-        Note: For production, use numpy/scipy for proper correlation calculation.
-        This is a simplified placeholder.
+        Computed by Postgres' corr() in a single aggregate query, so only
+        the coefficients come back rather than every row.
         """
-        cutoff = date.today() - timedelta(days=days)
-        summaries = list(DailySummary.objects.filter(
+        cutoff, window = cls._window(user, days)
+        
+        # HRV of the following calendar day, for the lagged correlation
+        next_day_hrv = DailySummary.objects.filter(
             user=user,
-            date__gte=cutoff
-        ).values(
-            'date', 'calories', 'protein_g', 'steps', 'sleep_duration_min',
-            'deep_sleep_min', 'resting_hr', 'hrv_rmssd', 'sleep_score',
-            'readiness_score'
-        ))
-        
-        if len(summaries) < 7:
+            date=OuterRef('date') + timedelta(days=1)
+        ).values('hrv_rmssd')[:1]
+        
+        aggregates = {'sample_size': Count('id')}
+        for name, (x, y) in cls.CORRELATIONS.items():
+            aggregates[name] = Corr(y, x)
+            aggregates[f'{name}_n'] = RegrCount(y, x)
+        
+        stats = window.annotate(next_day_hrv=Subquery(next_day_hrv)).aggregate(**aggregates)
+        
+        if stats['sample_size'] < cls.MIN_CORRELATION_SAMPLES:
             return {'error': 'Insufficient data for correlation analysis'}
         
-        # TODO: Implement proper correlation calculation with numpy
-        # For now, return structure placeholder
+        correlations = {}
+        for name in cls.CORRELATIONS:
+            coefficient = stats[name]
+            enough = stats[f'{name}_n'] >= cls.MIN_CORRELATION_SAMPLES
+            correlations[name] = round(coefficient, 3) if enough and coefficient is not None else None
+        
         return {
-            'sample_size': len(summaries),
+            'sample_size': stats['sample_size'],
             'date_range': {
                 'start': cutoff.isoformat(),
-                'end': date.today().isoformat()
+                'end': (cutoff + timedelta(days=days)).isoformat()
             },
-            'correlations': {
-                'protein_vs_deep_sleep': None,  # Calculate with numpy
-                'steps_vs_sleep_quality': None,
-                'hrv_vs_readiness': None,
-                'calories_vs_next_day_hrv': None,
-            }
+            'correlations': correlations
         }
     
     @classmethod
@@ -322,59 +478,54 @@ class InsightsService:
         """
         Find days where metrics deviate significantly from baseline.
         """
-        # Get baseline averages
-        averages = cls.get_averages(user, days)
+        # (metric, DailySummary field, allowed deviation, allowed fraction of baseline)
+        checks = [
+            ('hrv', 'hrv_rmssd', 0, 0.3),  # 30% deviation
+            ('resting_hr', 'resting_hr', 8, 0),  # 8 bpm deviation
+            ('sleep', 'sleep_duration_min', 90, 0),  # 1.5 hour deviation
+        ]
         
-        # Get recent data
-        cutoff = date.today() - timedelta(days=days)
-        summaries = DailySummary.objects.filter(
-            user=user,
-            date__gte=cutoff
+        # The window is read once; baselines are averaged from the same rows
+        # rather than by a second aggregate over it
+        _, window = cls._window(user, days)
+        rows = list(window.values_list('date', *(field for _, field, _, _ in checks)))
+        
+        if not rows:
+            return []
+        
+        # One row per day, one column per check; missing values become NaN,
+        # and so does a missing/zero baseline, which never compares as deviating
+        values = np.array([row[1:] for row in rows], dtype=float)
+        present = ~np.isnan(values)
+        counts = present.sum(axis=0)
+        baselines = np.divide(
+            np.where(present, values, 0).sum(axis=0), counts,
+            out=np.full(len(checks), np.nan), where=counts > 0
+        )
+        baselines[baselines == 0] = np.nan
+        limits = (
+            np.array([limit for _, _, limit, _ in checks], dtype=float)
+            + np.array([fraction for _, _, _, fraction in checks], dtype=float) * baselines
         )
         
-        anomalies = []
+        diff = values - baselines
+        flagged = (values != 0) & (np.abs(diff) > limits)
+        direction = np.sign(diff)
         
-        for summary in summaries:
+        anomalies = []
+        for i in np.flatnonzero(flagged.any(axis=1)):
             day_anomalies = []
-            
-            # Check HRV
-            if summary.hrv_rmssd and averages['avg_hrv']:
-                hrv_diff = abs(summary.hrv_rmssd - averages['avg_hrv'])
-                if hrv_diff > averages['avg_hrv'] * 0.3:  # 30% deviation
-                    day_anomalies.append({
-                        'metric': 'hrv',
-                        'value': summary.hrv_rmssd,
-                        'baseline': averages['avg_hrv'],
-                        'direction': 'high' if summary.hrv_rmssd > averages['avg_hrv'] else 'low'
-                    })
-            
-            # Check Resting HR
-            if summary.resting_hr and averages['avg_resting_hr']:
-                hr_diff = abs(summary.resting_hr - averages['avg_resting_hr'])
-                if hr_diff > 8:  # 8 bpm deviation
-                    day_anomalies.append({
-                        'metric': 'resting_hr',
-                        'value': summary.resting_hr,
-                        'baseline': averages['avg_resting_hr'],
-                        'direction': 'high' if summary.resting_hr > averages['avg_resting_hr'] else 'low'
-                    })
-            
-            # Check Sleep
-            if summary.sleep_duration_min and averages['avg_sleep']:
-                sleep_diff = abs(summary.sleep_duration_min - averages['avg_sleep'])
-                if sleep_diff > 90:  # 1.5 hour deviation
-                    day_anomalies.append({
-                        'metric': 'sleep',
-                        'value': summary.sleep_duration_min,
-                        'baseline': averages['avg_sleep'],
-                        'direction': 'high' if summary.sleep_duration_min > averages['avg_sleep'] else 'low'
-                    })
-            
-            if day_anomalies:
-                anomalies.append({
-                    'date': summary.date.isoformat(),
-                    'anomalies': day_anomalies
+            for j in np.flatnonzero(flagged[i]):
+                day_anomalies.append({
+                    'metric': checks[j][0],
+                    'value': rows[i][j + 1],
+                    'baseline': float(baselines[j]),
+                    'direction': 'high' if direction[i, j] > 0 else 'low'
                 })
+            anomalies.append({
+                'date': rows[i][0].isoformat(),
+                'anomalies': day_anomalies
+            })
         
         return anomalies
     
@@ -392,6 +543,14 @@ class InsightsService:
             today = date.today()
             week_start = today - timedelta(days=today.weekday())
         
+        return cls._cached(
+            user,
+            f'weekly:{week_start.isoformat()}',
+            lambda: cls._compute_weekly_report(user, week_start),
+        )
+    
+    @classmethod
+    def _compute_weekly_report(cls, user: Optional[User], week_start: date) -> dict:
         week_end = week_start + timedelta(days=6)
         
         summaries = DailySummary.objects.filter(
@@ -400,30 +559,43 @@ class InsightsService:
             date__lte=week_end
         )
         
-        days_with_data = summaries.count()
+        # Every statistic in one pass over the week
+        stats = summaries.aggregate(
+            days_with_data=Count('id'),
+            avg_calories=Avg('calories'),
+            avg_protein=Avg('protein_g'),
+            avg_steps=Avg('steps'),
+            avg_sleep_min=Avg('sleep_duration_min'),
+            avg_deep_sleep=Avg('deep_sleep_min'),
+            avg_hrv=Avg('hrv_rmssd'),
+            avg_resting_hr=Avg('resting_hr'),
+            avg_sleep_score=Avg('sleep_score'),
+            avg_readiness=Avg('readiness_score'),
+            total_steps=Sum('steps'),
+            total_active_minutes=Sum('active_zone_minutes'),
+            best_sleep=Max('sleep_score'),
+            highest_hrv=Max('hrv_rmssd'),
+            most_steps=Max('steps'),
+        )
         
         return {
             'week_start': week_start.isoformat(),
             'week_end': week_end.isoformat(),
-            'days_with_data': days_with_data,
-            'averages': summaries.aggregate(
-                avg_calories=Avg('calories'),
-                avg_protein=Avg('protein_g'),
-                avg_steps=Avg('steps'),
-                avg_sleep_min=Avg('sleep_duration_min'),
-                avg_deep_sleep=Avg('deep_sleep_min'),
-                avg_hrv=Avg('hrv_rmssd'),
-                avg_resting_hr=Avg('resting_hr'),
-                avg_sleep_score=Avg('sleep_score'),
-                avg_readiness=Avg('readiness_score'),
-            ),
-            'totals': summaries.aggregate(
-                total_steps=Sum('steps'),
-                total_active_minutes=Sum('active_zone_minutes'),
-            ),
+            'days_with_data': stats['days_with_data'],
+            'averages': {
+                key: stats[key] for key in (
+                    'avg_calories', 'avg_protein', 'avg_steps', 'avg_sleep_min',
+                    'avg_deep_sleep', 'avg_hrv', 'avg_resting_hr',
+                    'avg_sleep_score', 'avg_readiness',
+                )
+            },
+            'totals': {
+                'total_steps': stats['total_steps'],
+                'total_active_minutes': stats['total_active_minutes'],
+            },
             'bests': {
-                'best_sleep': summaries.aggregate(Max('sleep_score'))['sleep_score__max'],
-                'highest_hrv': summaries.aggregate(Max('hrv_rmssd'))['hrv_rmssd__max'],
-                'most_steps': summaries.aggregate(Max('steps'))['steps__max'],
+                'best_sleep': stats['best_sleep'],
+                'highest_hrv': stats['highest_hrv'],
+                'most_steps': stats['most_steps'],
             }
         }
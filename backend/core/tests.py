@@ -1,3 +1,199 @@
+import json
+import zlib
+from datetime import date, datetime, timedelta, timezone
+
+from django.contrib.auth.models import User
+from django.core import serializers
+from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ingestion.serializers import HealthRecordSerializer
+from .models import DATA_SOURCE_CODES, DailySummary, HealthRecord, NutritionLog
+from .services import DailySummaryService
+
+
+def _health_record(**kwargs) -> HealthRecord:
+    fields = {
+        'source': 'fitbit',
+        'metric_type': 'steps',
+        'value': 1000,
+        'unit': 'steps',
+        'timestamp': datetime(2024, 8, 25, tzinfo=timezone.utc),
+    }
+    fields.update(kwargs)
+    return HealthRecord(**fields)
+
+
+class DataSourceFieldTests(TestCase):
+    """Sources are stored as smallint codes but used as names."""
+
+    def test_stores_code_and_loads_name(self):
+        record = _health_record(source='garmin')
+        record.save()
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT source FROM core_healthrecord WHERE id = %s', [record.pk])
+            self.assertEqual(cursor.fetchone()[0], DATA_SOURCE_CODES['garmin'])
+        self.assertEqual(HealthRecord.objects.get(pk=record.pk).source, 'garmin')
+
+    def test_filters_by_name(self):
+        _health_record(source='fitbit').save()
+        _health_record(source='oura').save()
+
+        self.assertEqual(
+            list(HealthRecord.objects.filter(source='oura').values_list('source', flat=True)),
+            ['oura'],
+        )
+        self.assertFalse(HealthRecord.objects.filter(source='no_such_source').exists())
+
+    def test_unknown_name_rejected_on_save(self):
+        with self.assertRaisesMessage(ValueError, "'no_such_source'"):
+            _health_record(source='no_such_source').save()
+        with self.assertRaisesMessage(ValueError, "'no_such_source'"):
+            HealthRecord.objects.bulk_create([_health_record(source='no_such_source')])
+
+    def test_full_clean_checks_choices(self):
+        _health_record(source='fitbit').full_clean()
+
+        with self.assertRaises(ValidationError) as ctx:
+            _health_record(source='no_such_source').full_clean()
+        self.assertIn('source', ctx.exception.message_dict)
+
+    def test_serializer_validates_names(self):
+        data = {
+            'source': 'fitbit',
+            'metric_type': 'steps',
+            'value': 1000,
+            'unit': 'steps',
+            'timestamp': '2024-08-25T00:00:00Z',
+        }
+        serializer = HealthRecordSerializer(data=data)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.save().source, 'fitbit')
+
+        serializer = HealthRecordSerializer(data={**data, 'source': 'no_such_source'})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('source', serializer.errors)
+
+
+class CompressedJSONFieldTests(TestCase):
+    """raw_data is stored as compressed bytes but read back as JSON."""
+
+    RAW = {'dateTime': '08/25/24 00:00:00', 'value': '1000', 'nested': [1, 2.5, None]}
+
+    def test_save_and_load(self):
+        record = _health_record(raw_data=self.RAW)
+        record.save()
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT raw_data FROM core_healthrecord WHERE id = %s', [record.pk])
+            stored = bytes(cursor.fetchone()[0])
+        self.assertEqual(json.loads(zlib.decompress(stored)), self.RAW)
+        self.assertEqual(HealthRecord.objects.get(pk=record.pk).raw_data, self.RAW)
+
+    def test_null(self):
+        record = _health_record(raw_data=None)
+        record.save()
+
+        self.assertIsNone(HealthRecord.objects.get(pk=record.pk).raw_data)
+
+    def test_serializer_round_trip(self):
+        """dumpdata/loaddata keep the value, in every fixture format."""
+        record = _health_record(raw_data=self.RAW)
+        record.save()
+
+        for fmt in ('json', 'xml', 'python'):
+            with self.subTest(fmt=fmt):
+                data = serializers.serialize(fmt, [record])
+                HealthRecord.objects.filter(pk=record.pk).delete()
+                for obj in serializers.deserialize(fmt, data):
+                    obj.save()
+                self.assertEqual(HealthRecord.objects.get(pk=record.pk).raw_data, self.RAW)
+
+
+class BuildSummariesTests(TestCase):
+    """DailySummaryService upserts summaries for the affected dates."""
+
+    DAY = date(2024, 8, 25)
+
+    def setUp(self):
+        self.user = User.objects.create_user('summary-test')
+
+    def _log_nutrition(self, **fields):
+        NutritionLog.objects.update_or_create(
+            user=self.user, source='cronometer', date=self.DAY, defaults=fields,
+        )
+
+    def test_creates_summary(self):
+        self._log_nutrition(calories=2000, protein_g=100)
+
+        [summary] = DailySummaryService.build_summaries([self.DAY, self.DAY], self.user)
+
+        self.assertEqual(summary.calories, 2000)
+        stored = DailySummary.objects.get(user=self.user, date=self.DAY)
+        self.assertEqual(stored.pk, summary.pk)
+        self.assertEqual(stored.protein_pct, 20.0)
+
+    def test_rebuild_keeps_created_at(self):
+        self._log_nutrition(calories=2000, protein_g=100)
+        [first] = DailySummaryService.build_summaries([self.DAY], self.user)
+        created_at = first.created_at - timedelta(days=1)
+        DailySummary.objects.filter(pk=first.pk).update(created_at=created_at)
+
+        self._log_nutrition(calories=2500, protein_g=100)
+        [summary] = DailySummaryService.build_summaries([self.DAY], self.user)
+
+        self.assertEqual(summary.pk, first.pk)
+        self.assertEqual(summary.calories, 2500)
+        self.assertEqual(summary.created_at, created_at)
+        stored = DailySummary.objects.get(pk=first.pk)
+        self.assertEqual(stored.created_at, created_at)
+        self.assertEqual(stored.calories, 2500)
+
+    def test_generated_columns_current(self):
+        """Generated columns on the returned rows reflect the new values."""
+        self._log_nutrition(calories=2000, protein_g=100)
+        DailySummaryService.build_summaries([self.DAY], self.user)
+
+        self._log_nutrition(calories=4000, protein_g=100)
+        [summary] = DailySummaryService.build_summaries([self.DAY], self.user)
+
+        # Returned by the upsert itself, not loaded afterwards
+        with self.assertNumQueries(0):
+            self.assertEqual(summary.protein_pct, 10.0)
+        self.assertEqual(DailySummary.objects.get(pk=summary.pk).protein_pct, 10.0)
+
+    def test_bad_day_does_not_lose_others(self):
+        """A day failing a CHECK constraint is reported; the rest are saved."""
+        self._log_nutrition(calories=2000)
+        bad_day = self.DAY + timedelta(days=1)
+        NutritionLog.objects.create(user=self.user, source='cronometer', date=bad_day, calories=-5)
+
+        errors = []
+        summaries = DailySummaryService.build_summaries([self.DAY, bad_day], self.user, errors)
+
+        self.assertEqual([summary.date for summary in summaries], [self.DAY])
+        self.assertEqual(len(errors), 1)
+        self.assertIn(str(bad_day), errors[0])
+        self.assertEqual(
+            list(DailySummary.objects.filter(user=self.user).values_list('date', flat=True)),
+            [self.DAY],
+        )
+
+    def test_rebuild_all_covers_every_source(self):
+        self._log_nutrition(calories=2000)
+        _health_record(user=self.user, date=self.DAY + timedelta(days=1)).save()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(DailySummaryService.rebuild_all(self.user), 2)
 
-# Create your tests here.
+        # Only the union as a whole is sorted, not each branch's rows
+        union = next(q['sql'] for q in queries if 'UNION' in q['sql'])
+        self.assertEqual(union.count('ORDER BY'), 1)
+        self.assertEqual(
+            list(DailySummary.objects.filter(user=self.user)
+                 .order_by('date').values_list('date', flat=True)),
+            [self.DAY, self.DAY + timedelta(days=1)],
+        )
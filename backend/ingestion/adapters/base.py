@@ -8,19 +8,94 @@ to normalize their proprietary export formats into our unified schema.
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
+from hashlib import blake2b
 from pathlib import Path
-from typing import Generator, Any
+from typing import Callable, Generator, Any
 from uuid import UUID
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# Regex for each strptime directive, used to screen values before calling
+# strptime so non-matching formats don't cost a raised ValueError each
+_DIRECTIVE_PATTERNS = {
+    '%Y': r'\d{4}',
+    '%y': r'\d{2}',
+    '%m': r'\d{1,2}',
+    '%d': r'\d{1,2}',
+    '%H': r'\d{1,2}',
+    '%M': r'\d{1,2}',
+    '%S': r'\d{1,2}',
+    '%f': r'\d{1,6}',
+    '%z': r'(?:Z|[+-]\d{2}:?\d{2}(?::?\d{2})?)',
+    '%%': '%',
+}
 
-@dataclass
+# Formats datetime.fromisoformat() parses identically (and much faster)
+_ISO_FORMATS = frozenset({
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%dT%H:%M',
+    '%Y-%m-%d',
+})
+
+
+@lru_cache(maxsize=None)
+def _format_pattern(fmt: str) -> re.Pattern | None:
+    """Compile a strptime format into a regex, or None if it can't be."""
+    parts = []
+    for literal, directive in re.findall(r'([^%]*)(%.)?', fmt):
+        parts.append(re.escape(literal))
+        if directive:
+            if directive not in _DIRECTIVE_PATTERNS:
+                return None
+            parts.append(_DIRECTIVE_PATTERNS[directive])
+    return re.compile(''.join(parts))
+
+
+def _strptime(value: str, fmt: str) -> datetime | None:
+    """Parse value with fmt, returning None instead of raising on mismatch."""
+    pattern = _format_pattern(fmt)
+    if pattern is not None and not pattern.fullmatch(value):
+        return None
+    if fmt in _ISO_FORMATS:
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    try:
+        return datetime.strptime(value, fmt)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=65536)
+def _parse_with_formats(value: str, formats: tuple[str, ...]) -> datetime | None:
+    """
+    First successful parse of value across formats, memoized by raw string.
+    
+    Daily and per-sleep timestamps repeat across files and re-imports, so
+    a repeat costs a dict lookup; the regex screen in _strptime keeps a
+    miss to roughly one real parse.
+    """
+    for fmt in formats:
+        parsed = _strptime(value, fmt)
+        if parsed is not None:
+            return parsed
+    return None
+
+
+@dataclass(slots=True, kw_only=True)
 class ParsedRecord:
     """
     A normalized record ready to be saved to the database.
     This is the common format that all adapters output.
+
+    Slotted, and the dict fields default to None rather than an empty
+    dict, since intraday exports produce one of these per sample.
+    Keyword-only, so the many optional fields can't be passed out of order.
     """
     record_type: str  # 'health_record', 'sleep_log', 'nutrition_log'
     
@@ -36,13 +111,13 @@ class ParsedRecord:
     start_time: datetime | None = None
     end_time: datetime | None = None
     duration_minutes: int | None = None
-    sleep_data: dict = field(default_factory=dict)
+    sleep_data: dict | None = None
     
     # Nutrition-specific
-    nutrition_data: dict = field(default_factory=dict)
+    nutrition_data: dict | None = None
     
     # Common
-    metadata: dict = field(default_factory=dict)
+    metadata: dict | None = None
     raw_data: dict | None = None
 
 
@@ -51,7 +126,11 @@ class ParseResult:
     """Result of parsing an entire file or export."""
     success: bool
     records: list[ParsedRecord] = field(default_factory=list)
+    # The adapter's own errors list, handed over rather than copied; parse()
+    # starts a fresh list each run, so earlier results are unaffected
     errors: list[str] = field(default_factory=list)
+    # Total errors seen; errors itself is capped at BaseAdapter.MAX_ERRORS
+    error_count: int = 0
     records_parsed: int = 0
     file_path: str = ''
 
@@ -76,10 +155,19 @@ class BaseAdapter(ABC):
     # Override in subclasses
     SOURCE_NAME: str = 'unknown'
     SUPPORTED_FILE_TYPES: tuple[str, ...] = ()
+    # Error messages kept per parse; past this only error_count grows
+    MAX_ERRORS: int = 1000
     
     def __init__(self, batch_id: UUID | None = None):
         self.batch_id = batch_id
         self.errors: list[str] = []
+        self.error_count = 0
+        # Tells whether an earlier completed import read a file with this
+        # fingerprint in full; adapters may skip those unread. The caller
+        # sets it, and file_fingerprints collects the ones read in full
+        # this time.
+        self.fingerprint_lookup: Callable[[str], bool] | None = None
+        self.file_fingerprints: list[str] = []
     
     @abstractmethod
     def can_handle(self, path: Path) -> bool:
@@ -95,9 +183,21 @@ class BaseAdapter(ABC):
         pass
     
     @abstractmethod
+    def _iter_records(self, path: Path) -> Generator[ParsedRecord, None, None]:
+        """
+        Parse the file/directory, yielding normalized records as they're read.
+        
+        Subclasses implement this; parse() and parse_streaming() are built on it.
+        Errors should be reported through _log_error().
+        
+        Args:
+            path: Path to file or directory to parse
+        """
+        pass
+    
     def parse(self, path: Path) -> ParseResult:
         """
-        Parse the file/directory and yield normalized records.
+        Parse the file/directory into a list of normalized records.
         
         Args:
             path: Path to file or directory to parse
@@ -105,22 +205,58 @@ class BaseAdapter(ABC):
         Returns:
             ParseResult with list of ParsedRecord objects
         """
-        pass
+        self.errors = []
+        self.error_count = 0
+        self.file_fingerprints = []
+        records = list(self._iter_records(path))
+        
+        return ParseResult(
+            success=self.error_count == 0,
+            records=records,
+            errors=self.errors,
+            error_count=self.error_count,
+            records_parsed=len(records),
+            file_path=str(path)
+        )
     
     def parse_streaming(self, path: Path) -> Generator[ParsedRecord, None, None]:
         """
         Parse and yield records one at a time (memory efficient for large files).
-        Default implementation just wraps parse(), override for true streaming.
+        Errors are collected on self.errors as parsing proceeds.
         """
-        result = self.parse(path)
-        yield from result.records
+        self.errors = []
+        self.error_count = 0
+        self.file_fingerprints = []
+        yield from self._iter_records(path)
+    
+    @staticmethod
+    def _file_fingerprint(file: Path) -> str:
+        """
+        Path, size, mtime and a hash of the first 4 KB of a file.
+        
+        Cheap however large the file is. Rewriting the file in place changes
+        it, and a copy elsewhere (such as a fresh upload) never matches.
+        """
+        stat = file.stat()
+        with open(file, 'rb') as f:
+            head = blake2b(f.read(4096), digest_size=8).hexdigest()
+        return f"{file.resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{head}"
+    
+    def _seen_before(self, fingerprint: str) -> bool:
+        """Whether an earlier completed import read this file in full."""
+        return self.fingerprint_lookup is not None and self.fingerprint_lookup(fingerprint)
     
     def _log_error(self, message: str, exception: Exception | None = None):
         """Log and track an error during parsing."""
+        self.error_count += 1
+        keep = self.error_count <= self.MAX_ERRORS
+        if not keep and not logger.isEnabledFor(logging.ERROR):
+            return
         if exception:
             message = f"{message}: {str(exception)}"
-        logger.error(f"[{self.SOURCE_NAME}] {message}")
-        self.errors.append(message)
+        logger.error("[%s] %s", self.SOURCE_NAME, message)
+        if keep:
+            self.errors.append(message)
     
     def _parse_datetime(self, value: str, formats: list[str]) -> datetime | None:
         """
@@ -133,11 +269,9 @@ class BaseAdapter(ABC):
         Returns:
             Parsed datetime or None if all formats fail
         """
-        for fmt in formats:
-            try:
-                return datetime.strptime(value, fmt)
-            except ValueError:
-                continue
+        parsed = _parse_with_formats(value, tuple(formats))
+        if parsed is not None:
+            return parsed
         
         self._log_error(f"Could not parse datetime: {value}")
         return None
@@ -149,12 +283,30 @@ class AdapterRegistry:
     Use this to find the right adapter for a given file.
     """
     
-    _adapters: list[type[BaseAdapter]] = []
+    # SOURCE_NAME -> adapter, in registration order
+    _adapters: dict[str, type[BaseAdapter]] = {}
+    # File suffix -> adapters listing it in SUPPORTED_FILE_TYPES
+    _adapters_by_suffix: dict[str, list[type[BaseAdapter]]] = {}
+    # (path, mtime) -> adapter that accepted it, so re-ingesting an
+    # unchanged file or export folder skips the can_handle() scans
+    _matches: dict[tuple[str, int], type[BaseAdapter]] = {}
+    _MAX_MATCHES = 64
     
     @classmethod
     def register(cls, adapter_class: type[BaseAdapter]):
         """Register an adapter class."""
-        cls._adapters.append(adapter_class)
+        existing = cls._adapters.get(adapter_class.SOURCE_NAME)
+        if existing is adapter_class:
+            return adapter_class
+        if existing is not None:
+            raise ValueError(
+                f"Adapter {existing.__name__} is already registered "
+                f"for source '{adapter_class.SOURCE_NAME}'"
+            )
+        cls._adapters[adapter_class.SOURCE_NAME] = adapter_class
+        cls._matches.clear()
+        for suffix in adapter_class.SUPPORTED_FILE_TYPES:
+            cls._adapters_by_suffix.setdefault(suffix.lower(), []).append(adapter_class)
         return adapter_class
     
     @classmethod
@@ -169,21 +321,42 @@ class AdapterRegistry:
         Returns:
             An adapter instance or None if no adapter matches
         """
-        for adapter_class in cls._adapters:
+        # A directory's mtime changes when entries are added or removed,
+        # so a cached match never outlives the contents it was made for
+        try:
+            key = (str(path), path.stat().st_mtime_ns)
+        except OSError:
+            key = None
+        adapter_class = cls._matches.get(key)
+        if adapter_class is not None:
+            return adapter_class(batch_id=batch_id)
+        
+        # Files only go to adapters that support their suffix;
+        # directories can hold anything, so every adapter gets a look
+        if path.is_dir():
+            candidates = cls._adapters.values()
+        else:
+            candidates = cls._adapters_by_suffix.get(path.suffix.lower(), [])
+        
+        for adapter_class in candidates:
             adapter = adapter_class(batch_id=batch_id)
             if adapter.can_handle(path):
+                if key is not None:
+                    if len(cls._matches) >= cls._MAX_MATCHES:
+                        cls._matches.clear()
+                    cls._matches[key] = adapter_class
                 return adapter
         return None
     
     @classmethod
     def get_adapter_by_name(cls, name: str, batch_id: UUID | None = None) -> BaseAdapter | None:
         """Get an adapter by its SOURCE_NAME."""
-        for adapter_class in cls._adapters:
-            if adapter_class.SOURCE_NAME == name:
-                return adapter_class(batch_id=batch_id)
-        return None
+        adapter_class = cls._adapters.get(name)
+        if adapter_class is None:
+            return None
+        return adapter_class(batch_id=batch_id)
     
     @classmethod
     def list_adapters(cls) -> list[str]:
         """List all registered adapter names."""
-        return [a.SOURCE_NAME for a in cls._adapters]
+        return list(cls._adapters)
@@ -11,11 +11,19 @@ import pandas as pd
 import numpy as np
 import json
 import csv
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, date
+from functools import lru_cache
 from pathlib import Path
 from typing import Generator
 import logging
 
+from .base import _strptime
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,27 +32,46 @@ class DataProcessor:
     Utility class for processing health data with pandas.
     """
     
-    # Fitbit's datetime formats
+    # Directory for pickled minute-level frames; None disables the cache.
+    # Only the ingest_data command sets it, so the web server never loads
+    # pickles while handling uploads.
+    cache_dir: Path | None = None
+    
+    # Processes for aggregate_all_files. The ingest_data command raises it;
+    # web requests aggregate in-process rather than spawning a pool.
+    max_workers: int = 1
+    
+    # Cache limits, enforced after each write
+    CACHE_MAX_BYTES = 2 * 1024 ** 3
+    CACHE_MAX_AGE = 30 * 24 * 60 * 60  # seconds since last use
+    
+    # Fitbit's datetime formats, most common first. No string matches
+    # more than one, so the order only affects how soon a match is found.
     DATETIME_FORMATS = [
-        '%m/%d/%y %H:%M:%S',      # 07/27/24 06:53:41
         '%Y-%m-%dT%H:%M:%S.%f',   # 2024-08-25T03:44:00.000
         '%Y-%m-%dT%H:%M:%S',      # 2024-08-25T03:44:00
+        '%Y-%m-%d',               # 2024-08-25
         '%Y-%m-%dT%H:%M:%SZ',     # 2024-08-25T03:44:00Z
         '%Y-%m-%dT%H:%M',         # 2024-07-27T10:56
-        '%Y-%m-%d',               # 2024-08-25
+        '%m/%d/%y %H:%M:%S',      # 07/27/24 06:53:41 (legacy exports)
     ]
     
     @classmethod
+    @lru_cache(maxsize=4096)
     def parse_datetime(cls, dt_string: str) -> datetime | None:
-        """Try multiple datetime formats to parse a string."""
+        """
+        Try multiple datetime formats to parse a string.
+        Memoized, since exports repeat the same timestamps across files.
+        """
         if not dt_string:
             return None
         
+        # Regex-screened, with fromisoformat() for the ISO formats, so
+        # formats that don't match cost no raised ValueError
         for fmt in cls.DATETIME_FORMATS:
-            try:
-                return datetime.strptime(dt_string, fmt)
-            except ValueError:
-                continue
+            parsed = _strptime(dt_string, fmt)
+            if parsed is not None:
+                return parsed
         
         # Try pandas as fallback (handles many formats)
         try:
@@ -54,10 +81,65 @@ class DataProcessor:
             return None
     
     @classmethod
-    def load_json_to_dataframe(cls, file_path: Path) -> pd.DataFrame:
+    def parse_datetime_series(cls, values: pd.Series) -> pd.Series:
+        """
+        Vectorized parse_datetime: each known format is tried over the
+        still-unparsed rows in one pass, and only what none of them match
+        goes through the per-value fallback. Unparseable rows become NaT.
+        """
+        strings = values.astype('string')
+        parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[us]')
+        
+        remaining = strings.notna() & (strings != '')
+        if not remaining.any():
+            return parsed
+        
+        # Columns rarely mix formats, and a format that fails on every row
+        # costs far more than one that matches, so lead with the format
+        # of the first value
+        formats = list(cls.DATETIME_FORMATS)
+        first = strings[remaining].iloc[0]
+        for fmt in formats:
+            try:
+                datetime.strptime(first, fmt)
+            except ValueError:
+                continue
+            formats.remove(fmt)
+            formats.insert(0, fmt)
+            break
+        
+        for fmt in formats:
+            if not remaining.any():
+                return parsed
+            # cache=True parses each distinct string once
+            parsed[remaining] = pd.to_datetime(
+                strings[remaining], format=fmt, errors='coerce', cache=True
+            )
+            remaining &= parsed.isna()
+        
+        if remaining.any():
+            fallback = [cls.parse_datetime(v) for v in strings[remaining]]
+            # Keep the wall-clock time of offset-aware results, as the
+            # scalar path's .date() does
+            parsed[remaining] = pd.to_datetime(
+                [dt.replace(tzinfo=None) if dt is not None else None for dt in fallback]
+            )
+        
+        return parsed
+    
+    @classmethod
+    def load_json_to_dataframe(
+        cls,
+        file_path: Path,
+        columns: list[str] | None = None
+    ) -> pd.DataFrame:
         """
         Load a Fitbit JSON file into a pandas DataFrame.
         Handles the [{dateTime, value}, ...] format.
+        
+        Args:
+            file_path: Path to the JSON file
+            columns: Keep only these keys from each record (all if None)
         """
         with open(file_path, 'r') as f:
             data = json.load(f)
@@ -65,9 +147,214 @@ class DataProcessor:
         if not data:
             return pd.DataFrame()
         
-        df = pd.DataFrame(data)
+        df = pd.DataFrame(data, columns=columns)
         return df
     
+    @classmethod
+    def load_minute_data(
+        cls,
+        file_path: Path,
+        value_column: str = 'value'
+    ) -> pd.DataFrame:
+        """
+        Load a minute-level JSON file with its dateTime column parsed into
+        'datetime' (NaT where unparseable). Only dateTime and value_column
+        are kept; nothing downstream reads the other keys.
+        
+        With cache_dir set, the parsed frame is pickled there, keyed on the
+        file's contents, so re-importing an unchanged export skips both the
+        JSON load and the date parsing.
+        """
+        cache_path = None
+        if cls.cache_dir is not None:
+            cache_path = cls._cache_path(file_path, value_column)
+            df = cls._read_cache(cache_path)
+            if df is not None:
+                return df
+        
+        df = cls.load_json_to_dataframe(
+            file_path, columns=['dateTime', value_column]
+        )
+        if not df.empty:
+            df['datetime'] = cls.parse_datetime_series(df['dateTime'])
+        
+        if cache_path is not None:
+            cls._write_cache(cache_path, df)
+        
+        return df
+    
+    @classmethod
+    def _cache_path(cls, file_path: Path, value_column: str) -> Path:
+        """Cache entry for a file's contents, parsed with value_column."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f'{pd.__version__}:{value_column}:'.encode())
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return cls.cache_dir / f'{digest.hexdigest()}.pkl'
+    
+    @staticmethod
+    def _read_cache(cache_path: Path) -> pd.DataFrame | None:
+        """The cached frame, or None if missing or unreadable."""
+        try:
+            df = pd.read_pickle(cache_path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # Truncated, or written by an incompatible pandas
+            logger.warning(f"Discarding unreadable cache entry {cache_path.name}: {e}")
+            cache_path.unlink(missing_ok=True)
+            return None
+        # Touch on hit, so pruning drops the least recently used entries
+        os.utime(cache_path)
+        return df
+    
+    @classmethod
+    def _write_cache(cls, cache_path: Path, df: pd.DataFrame):
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so a concurrent reader never sees half a file
+        tmp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            df.to_pickle(tmp_path)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Could not cache {cache_path.name}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+        cls._prune_cache()
+    
+    @classmethod
+    def _prune_cache(cls):
+        """
+        Drop entries unused for CACHE_MAX_AGE, then the least recently used
+        until the cache fits in CACHE_MAX_BYTES.
+        
+        Only this cache's own files are touched, in case cache_dir is
+        shared with something else.
+        """
+        cutoff = datetime.now().timestamp() - cls.CACHE_MAX_AGE
+        entries = []
+        try:
+            with os.scandir(cls.cache_dir) as it:
+                for entry in it:
+                    # .tmp files are left behind by killed writers
+                    if not entry.name.endswith(('.pkl', '.tmp')):
+                        continue
+                    try:
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+                        stat = entry.stat(follow_symlinks=False)
+                        if stat.st_mtime < cutoff:
+                            os.unlink(entry.path)
+                        elif entry.name.endswith('.pkl'):
+                            entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    except OSError:
+                        continue  # Removed by another worker, or not ours to remove
+        except OSError as e:
+            logger.warning(f"Could not prune cache {cls.cache_dir}: {e}")
+            return
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= cls.CACHE_MAX_BYTES:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            total -= size
+    
+    @classmethod
+    def aggregate_all_files(
+        cls,
+        jobs: dict[Path, str],
+        max_workers: int | None = None
+    ) -> dict[Path, pd.DataFrame | Exception]:
+        """
+        Run aggregate_* methods over many files, in parallel processes when
+        more than one worker is allowed.
+        
+        Each file's aggregation is CPU-bound and independent of the others,
+        and the results (one row per day) are cheap to send back.
+        
+        Args:
+            jobs: File path -> name of the DataProcessor method to run on it
+            max_workers: Process count (default: cls.max_workers, at most one per file)
+            
+        Returns:
+            File path -> aggregated DataFrame, or the exception it raised
+        """
+        workers = min(len(jobs), max_workers or cls.max_workers)
+        if workers < 2:
+            return {path: _run_aggregate(method, path) for path, method in jobs.items()}
+        
+        # Workers come from a clean forkserver process rather than forking
+        # the caller, which may hold threads, locks and DB connections
+        results = {}
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('forkserver'),
+                initializer=_init_worker,
+                initargs=(cls.cache_dir,),
+            ) as executor:
+                futures = {
+                    path: executor.submit(_run_aggregate, method, path)
+                    for path, method in jobs.items()
+                }
+                for path, future in futures.items():
+                    results[path] = future.result()
+        except BrokenProcessPool as e:
+            # A worker died (e.g. killed for memory); don't lose the export
+            logger.warning(
+                f"Aggregation worker died ({e}); aggregating the "
+                f"{len(jobs) - len(results)} remaining files in-process"
+            )
+        
+        return {
+            path: results[path] if path in results else _run_aggregate(method, path)
+            for path, method in jobs.items()
+        }
+    
+    @staticmethod
+    def to_numeric(values: pd.Series) -> pd.Series:
+        """
+        pd.to_numeric(values, errors='coerce'), converting each distinct
+        value once. Minute-level exports repeat a few hundred value strings
+        across hundreds of thousands of rows.
+        """
+        try:
+            codes, uniques = pd.factorize(values)
+        except TypeError:
+            # Unhashable values (e.g. dicts); they coerce to NaN anyway
+            return pd.to_numeric(values, errors='coerce')
+        
+        numbers = pd.to_numeric(pd.Series(uniques), errors='coerce').to_numpy()
+        if (codes < 0).any():
+            # Missing values have code -1, which picks this trailing NaN
+            numbers = np.append(numbers.astype(float), np.nan)
+        return pd.Series(numbers[codes], index=values.index)
+    
+    @classmethod
+    def _aggregate_by_day(cls, df: pd.DataFrame, **aggs) -> pd.DataFrame:
+        """
+        groupby(date).agg(**aggs) over the parsed 'datetime' column.
+        
+        Groups on the datetime64 day instead of a per-row column of Python
+        date objects; only the per-day keys are converted to dates. Each
+        (column, func) pair is run as a direct method call on the column
+        group (g.sum(), g.count(), ...), which goes straight to the
+        Cython kernels rather than through .agg's dispatch.
+        """
+        day = df['datetime'].dt.normalize().rename('date')
+        grouped = df.groupby(day)
+        result = pd.DataFrame({
+            name: getattr(grouped[column], func)()
+            for name, (column, func) in aggs.items()
+        }).reset_index()
+        result['date'] = result['date'].dt.date
+        return result
+    
     @classmethod
     def aggregate_minute_data_to_daily(
         cls, 
@@ -88,42 +375,40 @@ class DataProcessor:
         Returns:
             DataFrame with columns: date, value, record_count
         """
-        df = cls.load_json_to_dataframe(file_path)
+        df = cls.load_minute_data(file_path, value_column)
         
         if df.empty:
             return pd.DataFrame(columns=['date', 'value', 'record_count'])
         
-        # Parse datetime
-        df['datetime'] = df['dateTime'].apply(cls.parse_datetime)
         df = df.dropna(subset=['datetime'])
         
-        # Extract date
-        df['date'] = df['datetime'].dt.date
-        
         # Convert value to numeric, coercing errors
-        df['value'] = pd.to_numeric(df[value_column], errors='coerce')
+        df['value'] = cls.to_numeric(df[value_column])
         df = df.dropna(subset=['value'])
         
         # Aggregate by date
         if agg_func == 'sum':
-            result = df.groupby('date').agg(
+            result = cls._aggregate_by_day(
+                df,
                 value=('value', 'sum'),
                 record_count=('value', 'count'),
                 min_value=('value', 'min'),
                 max_value=('value', 'max'),
-            ).reset_index()
+            )
         elif agg_func == 'mean':
-            result = df.groupby('date').agg(
+            result = cls._aggregate_by_day(
+                df,
                 value=('value', 'mean'),
                 record_count=('value', 'count'),
                 min_value=('value', 'min'),
                 max_value=('value', 'max'),
-            ).reset_index()
+            )
         else:
-            result = df.groupby('date').agg(
+            result = cls._aggregate_by_day(
+                df,
                 value=('value', agg_func),
                 record_count=('value', 'count'),
-            ).reset_index()
+            )
         
         return result
     
@@ -134,35 +419,29 @@ class DataProcessor:
         
         Returns DataFrame with: date, total_steps, step_records, first_step_time, last_step_time
         """
-        df = cls.load_json_to_dataframe(file_path)
+        df = cls.load_minute_data(file_path)
         
         if df.empty:
             return pd.DataFrame()
         
-        # Parse datetime
-        df['datetime'] = df['dateTime'].apply(cls.parse_datetime)
         df = df.dropna(subset=['datetime'])
-        df['date'] = df['datetime'].dt.date
         
         # Convert steps to numeric
-        df['steps'] = pd.to_numeric(df['value'], errors='coerce').fillna(0).astype(int)
+        df['steps'] = cls.to_numeric(df['value']).fillna(0).astype(int)
         
-        # Only keep records with steps > 0 for time analysis
-        steps_df = df[df['steps'] > 0]
+        aggs = {
+            'total_steps': ('steps', 'sum'),
+            'records_count': ('steps', 'count'),
+        }
         
-        # Aggregate
-        result = df.groupby('date').agg(
-            total_steps=('steps', 'sum'),
-            records_count=('steps', 'count'),
-        ).reset_index()
+        # First/last step time, from records with steps > 0 only
+        stepping = df['steps'] > 0
+        if stepping.any():
+            df['step_time'] = df['datetime'].where(stepping)
+            aggs['first_step_time'] = ('step_time', 'min')
+            aggs['last_step_time'] = ('step_time', 'max')
         
-        # Add first/last step time
-        if not steps_df.empty:
-            time_info = steps_df.groupby('date').agg(
-                first_step_time=('datetime', 'min'),
-                last_step_time=('datetime', 'max'),
-            ).reset_index()
-            result = result.merge(time_info, on='date', how='left')
+        result = cls._aggregate_by_day(df, **aggs)
         
         return result
     
@@ -173,29 +452,28 @@ class DataProcessor:
         
         Returns DataFrame with: date, total_calories, avg_per_minute, active_minutes
         """
-        df = cls.load_json_to_dataframe(file_path)
+        df = cls.load_minute_data(file_path)
         
         if df.empty:
             return pd.DataFrame()
         
-        df['datetime'] = df['dateTime'].apply(cls.parse_datetime)
         df = df.dropna(subset=['datetime'])
-        df['date'] = df['datetime'].dt.date
         
         # Calories are per-minute burn rate
-        df['calories'] = pd.to_numeric(df['value'], errors='coerce').fillna(0)
+        df['calories'] = cls.to_numeric(df['value']).fillna(0)
         
         # Base metabolic rate is ~1.2 cal/min at rest
         # Count "active" as anything above that threshold
         BASE_RATE = 1.3
         df['is_active'] = df['calories'] > BASE_RATE
         
-        result = df.groupby('date').agg(
+        result = cls._aggregate_by_day(
+            df,
             total_calories=('calories', 'sum'),
             avg_per_minute=('calories', 'mean'),
             active_minutes=('is_active', 'sum'),
             records_count=('calories', 'count'),
-        ).reset_index()
+        )
         
         # Round appropriately
         result['total_calories'] = result['total_calories'].round(0).astype(int)
@@ -211,22 +489,21 @@ class DataProcessor:
         
         Returns DataFrame with: date, total_distance_km, total_distance_miles
         """
-        df = cls.load_json_to_dataframe(file_path)
+        df = cls.load_minute_data(file_path)
         
         if df.empty:
             return pd.DataFrame()
         
-        df['datetime'] = df['dateTime'].apply(cls.parse_datetime)
         df = df.dropna(subset=['datetime'])
-        df['date'] = df['datetime'].dt.date
         
         # Distance values appear to be in some small unit - check actual data
-        df['distance'] = pd.to_numeric(df['value'], errors='coerce').fillna(0)
+        df['distance'] = cls.to_numeric(df['value']).fillna(0)
         
-        result = df.groupby('date').agg(
+        result = cls._aggregate_by_day(
+            df,
             total_distance=('distance', 'sum'),
             records_count=('distance', 'count'),
-        ).reset_index()
+        )
         
         # Convert to km (assuming mm input based on typical step length)
         result['total_distance_km'] = (result['total_distance'] / 1_000_000).round(2)
@@ -234,6 +511,23 @@ class DataProcessor:
         
         return result
     
+    @staticmethod
+    def load_csv_rows(file_path: Path) -> Generator[dict[str, str], None, None]:
+        """
+        Rows of a CSV file as {column: string}, like csv.DictReader.
+        
+        Tokenizing is done by pandas' C parser with every column kept as a
+        string and no NA conversion, so values match what DictReader gives.
+        """
+        try:
+            df = pd.read_csv(file_path, dtype=str, keep_default_na=False)
+        except pd.errors.EmptyDataError:
+            return
+        
+        columns = df.columns.tolist()
+        for values in zip(*(df[column].tolist() for column in columns)):
+            yield dict(zip(columns, values))
+    
     @classmethod
     def load_daily_csv_with_date(
         cls, 
@@ -249,7 +543,7 @@ class DataProcessor:
         if df.empty or date_column not in df.columns:
             return pd.DataFrame()
         
-        df['parsed_date'] = df[date_column].apply(cls.parse_datetime)
+        df['parsed_date'] = cls.parse_datetime_series(df[date_column])
         df = df.dropna(subset=['parsed_date'])
         df['date'] = df['parsed_date'].dt.date
         
@@ -278,7 +572,7 @@ class DataProcessor:
             logger.warning(f"No date column found in {file_path}")
             return pd.DataFrame()
         
-        df['datetime'] = df[date_col].apply(cls.parse_datetime)
+        df['datetime'] = cls.parse_datetime_series(df[date_col])
         df = df.dropna(subset=['datetime'])
         df['date'] = df['datetime'].dt.date
         
@@ -312,7 +606,7 @@ class DataProcessor:
         if not date_col:
             return pd.DataFrame()
         
-        df['datetime'] = df[date_col].apply(cls.parse_datetime)
+        df['datetime'] = cls.parse_datetime_series(df[date_col])
         df = df.dropna(subset=['datetime'])
         df['date'] = df['datetime'].dt.date
         
@@ -344,7 +638,7 @@ class DataProcessor:
         if not date_col:
             return pd.DataFrame()
         
-        df['datetime'] = df[date_col].apply(cls.parse_datetime)
+        df['datetime'] = cls.parse_datetime_series(df[date_col])
         df = df.dropna(subset=['datetime'])
         df['date'] = df['datetime'].dt.date
         
@@ -372,39 +666,58 @@ class DataProcessor:
         if df.empty:
             return df
         
-        result = df.copy()
+        # Rows to keep, filtered once at the end instead of copying the
+        # frame up front and re-slicing it per step
+        keep = np.ones(len(df), dtype=bool)
         
         # Remove duplicates
         if dedup_columns:
-            result = result.drop_duplicates(subset=dedup_columns, keep='last')
-        
-        # Remove outliers using z-score method
-        if remove_outliers and outlier_column and outlier_column in result.columns:
-            mean = result[outlier_column].mean()
-            std = result[outlier_column].std()
-            result = result[
-                (result[outlier_column] >= mean - outlier_std * std) &
-                (result[outlier_column] <= mean + outlier_std * std)
-            ]
-        
-        return result
+            keep &= ~df.duplicated(subset=dedup_columns, keep='last').to_numpy()
+        
+        # Remove outliers using z-score method (stats over the deduplicated rows)
+        if remove_outliers and outlier_column and outlier_column in df.columns:
+            values = df[outlier_column]
+            mean = values[keep].mean()
+            std = values[keep].std()
+            keep &= (
+                (values >= mean - outlier_std * std) &
+                (values <= mean + outlier_std * std)
+            ).to_numpy()
+        
+        return df[keep]
+    
+    # The validators take a single value or a whole array/Series; prefer
+    # filtering a frame in one call over validating row by row
     
     @classmethod
-    def validate_steps(cls, value: float) -> bool:
+    def validate_steps(cls, value):
         """Validate step count is reasonable."""
-        return 0 <= value <= 100000  # Max 100k steps/day
+        return (value >= 0) & (value <= 100000)  # Max 100k steps/day
     
     @classmethod
-    def validate_calories(cls, value: float) -> bool:
+    def validate_calories(cls, value):
         """Validate calorie count is reasonable."""
-        return 0 <= value <= 10000  # Max 10k calories/day
+        return (value >= 0) & (value <= 10000)  # Max 10k calories/day
     
     @classmethod
-    def validate_heart_rate(cls, value: float) -> bool:
+    def validate_heart_rate(cls, value):
         """Validate heart rate is reasonable."""
-        return 30 <= value <= 250
+        return (value >= 30) & (value <= 250)
     
     @classmethod
-    def validate_spo2(cls, value: float) -> bool:
+    def validate_spo2(cls, value):
         """Validate SpO2 is reasonable."""
-        return 70 <= value <= 100
+        return (value >= 70) & (value <= 100)
+
+
+def _init_worker(cache_dir: Path | None):
+    """Pool initializer; fresh worker processes don't inherit class state."""
+    DataProcessor.cache_dir = cache_dir
+
+
+def _run_aggregate(method: str, file_path: Path) -> pd.DataFrame | Exception:
+    """Worker for aggregate_all_files; returns the exception instead of raising."""
+    try:
+        return getattr(DataProcessor, method)(file_path)
+    except Exception as e:
+        return e
@@ -17,19 +17,72 @@ into daily summaries.
 """
 
 import json
-import csv
-from datetime import datetime, date
+import os
+import re
+from collections import defaultdict
+from datetime import datetime, date, time, timedelta
 from pathlib import Path
 from typing import Generator
+from uuid import UUID
+from functools import lru_cache
 import logging
 
 import pandas as pd
+from django.conf import settings
 
-from .base import BaseAdapter, ParsedRecord, ParseResult, AdapterRegistry
+from .base import BaseAdapter, ParsedRecord, AdapterRegistry
 from .data_processor import DataProcessor
 
 logger = logging.getLogger(__name__)
 
+# Top-level folders of a Fitbit export
+EXPORT_FOLDERS = frozenset({
+    'Global Export Data',
+    'Sleep Score',
+    'Active Zone Minutes (AZM)',
+})
+
+# Fitbit file naming patterns, matched against the lower-cased name
+EXPORT_FILE_PATTERN = re.compile(
+    r'heart_rate-|sleep-|steps-|calories-|sleep_score|active zone minutes'
+)
+
+# Date a Global Export Data file is named for, e.g. steps-2024-07-27.json
+FILE_DATE_PATTERN = re.compile(r'-(\d{4}-\d{2}-\d{2})\.(?:json|csv)$')
+
+# UserSleepScores score_time, e.g. 2025-10-08 08:43:30+0000
+SCORE_TIME_FORMAT = '%Y-%m-%d %H:%M:%S%z'
+
+# The UserSleepScores columns actually read, with their dtypes
+SLEEP_SCORE_DTYPES = {
+    'score_time': str,
+    'resting_heart_rate': float,
+    'sleep_id': str,
+}
+
+# Rows of UserSleepScores parsed at a time
+SLEEP_SCORE_CHUNK_SIZE = 50_000
+
+# Timestamp time-of-day for daily aggregate records
+MIDNIGHT = time()
+
+
+@lru_cache(maxsize=4096)
+def _parse_score_time(value) -> datetime | None:
+    """One UserSleepScores score_time, or None if it doesn't parse."""
+    try:
+        return datetime.strptime(value, SCORE_TIME_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+def _float_or_none(value) -> float | None:
+    """float(value), or None for a missing value (None or NaN)."""
+    # value != value is the NaN test, without pd.isna's array dispatch
+    if value is None or value != value:
+        return None
+    return float(value)
+
 
 @AdapterRegistry.register
 class FitbitAdapter(BaseAdapter):
@@ -49,154 +102,185 @@ class FitbitAdapter(BaseAdapter):
         '%Y-%m-%d',               # 2024-08-25
     ]
     
+    # Minute-level files aggregated ahead of time: name pattern -> DataProcessor method
+    MINUTE_AGGREGATES = {
+        'steps-': 'aggregate_steps_json',
+        'distance-': 'aggregate_distance_json',
+    }
+    
+    # Export folders parsed after Global Export Data, in order:
+    # (folder, filename glob, parser method)
+    FOLDER_PARSERS = (
+        ('Sleep Score', 'sleep_score.csv', '_parse_sleep_score_csv'),
+        ('Stress Score', 'Stress Score.csv', '_parse_stress_score_csv'),
+        ('Active Zone Minutes (AZM)', '*.csv', '_parse_azm_csv'),
+        # Daily HRV summary files
+        ('Heart Rate Variability', 'Daily Heart Rate Variability Summary*.csv', '_parse_daily_hrv_csv'),
+        ('Oxygen Saturation (SpO2)', 'Daily SpO2*.csv', '_parse_daily_spo2_csv'),
+        ('Daily Readiness', 'Daily Readiness Score*.csv', '_parse_daily_readiness_csv'),
+        ('Temperature', 'Computed Temperature*.csv', '_parse_temperature_csv'),
+        # UserSleepScores for RHR (UserSleeps for times)
+        ('Health Fitness Data_GoogleData', 'UserSleepScores_*.csv', '_parse_user_sleep_scores_csv'),
+    )
+    
+    # Filename pattern -> (parser method, extra args) per suffix; the first
+    # matching pattern wins, and a None method skips the file
+    FILE_PARSERS = {
+        '.json': (
+            # Skip minute-level heart rate data (~17k records/day)
+            # We'll use resting_heart_rate and daily HRV instead
+            ('heart_rate-', None, ()),
+            # Skip calories burned - wearable TDEE estimates are inaccurate
+            # We use food_logs (Cronometer) for actual nutrition tracking
+            ('calories-', None, ()),
+            ('sleep-', '_parse_sleep_json', ()),
+            ('steps-', '_parse_steps_json', ()),
+            ('resting_heart_rate-', '_parse_resting_hr_json', ()),
+            ('distance-', '_parse_distance_json', ()),
+            ('very_active_minutes-', '_parse_active_minutes_json', ('very_active',)),
+            ('moderately_active_minutes-', '_parse_active_minutes_json', ('moderately_active',)),
+            ('lightly_active_minutes-', '_parse_active_minutes_json', ('lightly_active',)),
+            ('sedentary_minutes-', '_parse_active_minutes_json', ('sedentary',)),
+            ('food_logs-', '_parse_food_logs_json', ()),
+        ),
+        '.csv': (
+            ('sleep_score', '_parse_sleep_score_csv', ()),
+            ('stress score', '_parse_stress_score_csv', ()),
+            ('active zone minutes', '_parse_azm_csv', ()),
+        ),
+    }
+    
+    def __init__(
+        self,
+        batch_id: UUID | None = None,
+        store_raw: bool | None = None,
+        already_ingested_dates: set[date] | None = None
+    ):
+        super().__init__(batch_id)
+        # Keep each source row on its record as raw_data; None defers to
+        # the FITBIT_STORE_RAW setting, read when parsing
+        self._store_raw = store_raw
+        # Global Export Data files covering only these dates are skipped
+        # unread; IngestionService fills this in for directory imports
+        self.already_ingested_dates: set[date] = already_ingested_dates or set()
+        # Frames aggregated by _parse_directory, consumed by the file parsers
+        self._aggregated: dict[Path, pd.DataFrame | Exception] = {}
+    
+    @property
+    def store_raw(self) -> bool:
+        if self._store_raw is None:
+            return settings.FITBIT_STORE_RAW
+        return self._store_raw
+    
     def can_handle(self, path: Path) -> bool:
         """
         Check if this looks like a Fitbit export.
         Look for characteristic folder names or file patterns.
         """
         if path.is_dir():
-            # Check for Fitbit folder structure
-            indicators = [
-                path / 'Global Export Data',
-                path / 'Sleep Score',
-                path / 'Active Zone Minutes (AZM)',
-            ]
-            return any(p.exists() for p in indicators)
+            # Check for Fitbit folder structure, in one directory listing
+            try:
+                with os.scandir(path) as entries:
+                    return any(entry.name in EXPORT_FOLDERS for entry in entries)
+            except OSError:
+                return False
         
         if path.is_file():
-            name = path.name.lower()
             # Fitbit file naming patterns
-            patterns = [
-                'heart_rate-',
-                'sleep-',
-                'steps-',
-                'calories-',
-                'sleep_score',
-                'active zone minutes',
-            ]
-            return any(p in name for p in patterns)
+            return EXPORT_FILE_PATTERN.search(path.name.lower()) is not None
         
         return False
     
-    def parse(self, path: Path) -> ParseResult:
+    def _iter_records(self, path: Path) -> Generator[ParsedRecord, None, None]:
         """
         Parse a Fitbit export directory or individual file.
         """
-        records: list[ParsedRecord] = []
-        self.errors = []
-        
         if path.is_dir():
-            records = self._parse_directory(path)
+            yield from self._parse_directory(path)
         elif path.is_file():
-            records = list(self._parse_file(path))
-        
-        return ParseResult(
-            success=len(self.errors) == 0,
-            records=records,
-            errors=self.errors,
-            records_parsed=len(records),
-            file_path=str(path)
-        )
+            yield from self._parse_file(path)
     
-    def _parse_directory(self, root: Path) -> list[ParsedRecord]:
+    def _parse_directory(self, root: Path) -> Generator[ParsedRecord, None, None]:
         """Parse an entire Fitbit export directory."""
-        records: list[ParsedRecord] = []
+        # One listing of the export root instead of probing each folder
+        with os.scandir(root) as entries:
+            folders = {entry.name for entry in entries if entry.is_dir()}
         
         # Parse Global Export Data (main data folder)
-        global_data = root / 'Global Export Data'
-        if global_data.exists():
-            for file in global_data.iterdir():
-                if file.suffix in self.SUPPORTED_FILE_TYPES:
-                    records.extend(self._parse_file(file))
-        
-        # Parse Sleep Score
-        sleep_score = root / 'Sleep Score' / 'sleep_score.csv'
-        if sleep_score.exists():
-            records.extend(self._parse_sleep_score_csv(sleep_score))
-        
-        # Parse Stress Score
-        stress_score = root / 'Stress Score' / 'Stress Score.csv'
-        if stress_score.exists():
-            records.extend(self._parse_stress_score_csv(stress_score))
-        
-        # Parse Active Zone Minutes
-        azm_folder = root / 'Active Zone Minutes (AZM)'
-        if azm_folder.exists():
-            for file in azm_folder.glob('*.csv'):
-                records.extend(self._parse_azm_csv(file))
+        if 'Global Export Data' in folders:
+            global_data = root / 'Global Export Data'
+            files = self._skip_ingested([
+                file for file in global_data.iterdir()
+                if file.suffix in self.SUPPORTED_FILE_TYPES
+            ])
+            # Aggregate every minute-level file up front, across processes
+            jobs = {}
+            for file in files:
+                for pattern, method in self.MINUTE_AGGREGATES.items():
+                    if pattern in file.name.lower():
+                        jobs[file] = method
+                        break
+            self._aggregated = DataProcessor.aggregate_all_files(jobs)
+            try:
+                for file in files:
+                    yield from self._parse_file(file)
+            finally:
+                self._aggregated = {}
         
-        # Parse Daily HRV Summary files
-        hrv_folder = root / 'Heart Rate Variability'
-        if hrv_folder.exists():
-            for file in hrv_folder.glob('Daily Heart Rate Variability Summary*.csv'):
-                records.extend(self._parse_daily_hrv_csv(file))
-        
-        # Parse Daily SpO2 files
-        spo2_folder = root / 'Oxygen Saturation (SpO2)'
-        if spo2_folder.exists():
-            for file in spo2_folder.glob('Daily SpO2*.csv'):
-                records.extend(self._parse_daily_spo2_csv(file))
+        # Parse the per-metric CSV folders
+        for folder, pattern, method in self.FOLDER_PARSERS:
+            if folder in folders:
+                for file in (root / folder).glob(pattern):
+                    yield from getattr(self, method)(file)
+    
+    def _skip_ingested(self, files: list[Path]) -> list[Path]:
+        """
+        files minus those whose dates are all in already_ingested_dates.
         
-        # Parse Daily Readiness files
-        readiness_folder = root / 'Daily Readiness'
-        if readiness_folder.exists():
-            for file in readiness_folder.glob('Daily Readiness Score*.csv'):
-                records.extend(self._parse_daily_readiness_csv(file))
+        A file named for a date holds that date up to the one the next file
+        of its kind (steps-, sleep-, ...) is named for, so it is only
+        skipped when every day in between is already ingested. The newest
+        file of each kind has no known end and is always read.
+        """
+        if not self.already_ingested_dates:
+            return files
         
-        # Parse Temperature files
-        temp_folder = root / 'Temperature'
-        if temp_folder.exists():
-            for file in temp_folder.glob('Computed Temperature*.csv'):
-                records.extend(self._parse_temperature_csv(file))
+        series = defaultdict(list)
+        for file in files:
+            match = FILE_DATE_PATTERN.search(file.name)
+            if match is None:
+                continue
+            try:
+                file_date = date.fromisoformat(match.group(1))
+            except ValueError:
+                continue
+            series[file.name[:match.start()].lower()].append((file_date, file))
         
-        # Parse Health Fitness Data_GoogleData (UserSleepScores for RHR, UserSleeps for times)
-        health_fitness_folder = root / 'Health Fitness Data_GoogleData'
-        if health_fitness_folder.exists():
-            for file in health_fitness_folder.glob('UserSleepScores_*.csv'):
-                records.extend(self._parse_user_sleep_scores_csv(file))
+        skipped = set()
+        for dated in series.values():
+            dated.sort()
+            for (start, file), (end, _) in zip(dated, dated[1:]):
+                if all(
+                    start + timedelta(days=offset) in self.already_ingested_dates
+                    for offset in range((end - start).days)
+                ):
+                    skipped.add(file)
         
-        return records
+        if skipped:
+            logger.info(f"Skipping {len(skipped)} files for already-ingested dates")
+        return [file for file in files if file not in skipped]
     
     def _parse_file(self, file: Path) -> Generator[ParsedRecord, None, None]:
         """Route a file to the appropriate parser based on filename."""
         name = file.name.lower()
+        parsers = self.FILE_PARSERS.get(file.suffix, ())
         
         try:
-            if file.suffix == '.json':
-                if 'heart_rate-' in name:
-                    # Skip minute-level heart rate data (~17k records/day)
-                    # We'll use resting_heart_rate and daily HRV instead
-                    pass
-                elif 'calories-' in name:
-                    # Skip calories burned - wearable TDEE estimates are inaccurate
-                    # We use food_logs (Cronometer) for actual nutrition tracking
-                    pass
-                elif 'sleep-' in name:
-                    yield from self._parse_sleep_json(file)
-                elif 'steps-' in name:
-                    yield from self._parse_steps_json(file)
-                elif 'resting_heart_rate-' in name:
-                    yield from self._parse_resting_hr_json(file)
-                elif 'distance-' in name:
-                    yield from self._parse_distance_json(file)
-                elif 'very_active_minutes-' in name:
-                    yield from self._parse_active_minutes_json(file, 'very_active')
-                elif 'moderately_active_minutes-' in name:
-                    yield from self._parse_active_minutes_json(file, 'moderately_active')
-                elif 'lightly_active_minutes-' in name:
-                    yield from self._parse_active_minutes_json(file, 'lightly_active')
-                elif 'sedentary_minutes-' in name:
-                    yield from self._parse_active_minutes_json(file, 'sedentary')
-                elif 'food_logs-' in name:
-                    yield from self._parse_food_logs_json(file)
-                    
-            elif file.suffix == '.csv':
-                if 'sleep_score' in name:
-                    yield from self._parse_sleep_score_csv(file)
-                elif 'stress score' in name:
-                    yield from self._parse_stress_score_csv(file)
-                elif 'active zone minutes' in name:
-                    yield from self._parse_azm_csv(file)
+            for pattern, method, args in parsers:
+                if pattern in name:
+                    if method is not None:
+                        yield from getattr(self, method)(file, *args)
+                    break
                     
         except Exception as e:
             self._log_error(f"Error parsing {file.name}", e)
@@ -205,6 +289,15 @@ class FitbitAdapter(BaseAdapter):
     # JSON Parsers
     # -------------------------------------------------------------------------
     
+    def _aggregate(self, file: Path, method: str) -> pd.DataFrame:
+        """Aggregated frame for a minute-level file, computed now if not prefetched."""
+        result = self._aggregated.pop(file, None)
+        if result is None:
+            return getattr(DataProcessor, method)(file)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    
     def _parse_heart_rate_json(self, file: Path) -> Generator[ParsedRecord, None, None]:
         """Parse heart_rate-YYYY-MM-DD.json files."""
         try:
@@ -227,7 +320,7 @@ class FitbitAdapter(BaseAdapter):
                     metadata={
                         'confidence': entry['value'].get('confidence', 0)
                     },
-                    raw_data=entry
+                    raw_data=entry if self.store_raw else None
                 )
         except Exception as e:
             self._log_error(f"Error parsing heart rate file {file.name}", e)
@@ -253,7 +346,7 @@ class FitbitAdapter(BaseAdapter):
                     record_type='sleep_log',
                     source=self.SOURCE_NAME,
                     timestamp=start_time,
-                    date=datetime.strptime(entry['dateOfSleep'], '%Y-%m-%d').date(),
+                    date=date.fromisoformat(entry['dateOfSleep']),
                     start_time=start_time,
                     end_time=end_time,
                     duration_minutes=entry.get('duration', 0) // 60000,  # ms to minutes
@@ -273,7 +366,7 @@ class FitbitAdapter(BaseAdapter):
                         'log_type': entry.get('logType'),
                         'info_code': entry.get('infoCode'),
                     },
-                    raw_data=entry
+                    raw_data=entry if self.store_raw else None
                 )
         except Exception as e:
             self._log_error(f"Error parsing sleep file {file.name}", e)
@@ -286,29 +379,28 @@ class FitbitAdapter(BaseAdapter):
         Instead of storing ~60,000 records per file, we store one per day.
         """
         try:
-            df = DataProcessor.aggregate_steps_json(file)
+            df = self._aggregate(file, 'aggregate_steps_json')
             
             if df.empty:
                 return
             
-            for _, row in df.iterrows():
-                # Validate the step count
-                if not DataProcessor.validate_steps(row['total_steps']):
-                    continue
-                
+            # Drop days with an implausible step count
+            df = df[DataProcessor.validate_steps(df['total_steps'])]
+            
+            for row in df.itertuples(index=False):
                 yield ParsedRecord(
                     record_type='health_record',
                     source=self.SOURCE_NAME,
                     metric_type='steps',
-                    value=float(row['total_steps']),
+                    value=float(row.total_steps),
                     unit='steps',
-                    timestamp=datetime.combine(row['date'], datetime.min.time()),
-                    date=row['date'],
+                    timestamp=datetime.combine(row.date, MIDNIGHT),
+                    date=row.date,
                     metadata={
                         'aggregation': 'daily_total',
-                        'records_count': int(row['records_count']),
-                        'first_step_time': str(row.get('first_step_time', '')),
-                        'last_step_time': str(row.get('last_step_time', '')),
+                        'records_count': int(row.records_count),
+                        'first_step_time': str(getattr(row, 'first_step_time', '')),
+                        'last_step_time': str(getattr(row, 'last_step_time', '')),
                     },
                     raw_data=None  # Don't store ~60k raw records
                 )
@@ -329,24 +421,23 @@ class FitbitAdapter(BaseAdapter):
             if df.empty:
                 return
             
-            for _, row in df.iterrows():
-                # Validate the calorie count
-                if not DataProcessor.validate_calories(row['total_calories']):
-                    continue
-                
+            # Drop days with an implausible calorie count
+            df = df[DataProcessor.validate_calories(df['total_calories'])]
+            
+            for row in df.itertuples(index=False):
                 yield ParsedRecord(
                     record_type='health_record',
                     source=self.SOURCE_NAME,
                     metric_type='calories_burned',
-                    value=float(row['total_calories']),
+                    value=float(row.total_calories),
                     unit='kcal',
-                    timestamp=datetime.combine(row['date'], datetime.min.time()),
-                    date=row['date'],
+                    timestamp=datetime.combine(row.date, MIDNIGHT),
+                    date=row.date,
                     metadata={
                         'aggregation': 'daily_total',
-                        'avg_per_minute': float(row['avg_per_minute']),
-                        'active_minutes': int(row['active_minutes']),
-                        'records_count': int(row['records_count']),
+                        'avg_per_minute': float(row.avg_per_minute),
+                        'active_minutes': int(row.active_minutes),
+                        'records_count': int(row.records_count),
                     },
                     raw_data=None
                 )
@@ -384,7 +475,7 @@ class FitbitAdapter(BaseAdapter):
                         unit='bpm',
                         timestamp=dt,
                         date=dt.date() if dt else None,
-                        raw_data=entry
+                        raw_data=entry if self.store_raw else None
                     )
         except Exception as e:
             self._log_error(f"Error parsing resting HR file {file.name}", e)
@@ -396,24 +487,24 @@ class FitbitAdapter(BaseAdapter):
         Uses pandas to aggregate minute-level data into daily totals.
         """
         try:
-            df = DataProcessor.aggregate_distance_json(file)
+            df = self._aggregate(file, 'aggregate_distance_json')
             
             if df.empty:
                 return
             
-            for _, row in df.iterrows():
+            for row in df.itertuples(index=False):
                 yield ParsedRecord(
                     record_type='health_record',
                     source=self.SOURCE_NAME,
                     metric_type='distance',
-                    value=float(row['total_distance_km']),
+                    value=float(row.total_distance_km),
                     unit='km',
-                    timestamp=datetime.combine(row['date'], datetime.min.time()),
-                    date=row['date'],
+                    timestamp=datetime.combine(row.date, MIDNIGHT),
+                    date=row.date,
                     metadata={
                         'aggregation': 'daily_total',
-                        'distance_miles': float(row['total_distance_miles']),
-                        'records_count': int(row['records_count']),
+                        'distance_miles': float(row.total_distance_miles),
+                        'records_count': int(row.records_count),
                     },
                     raw_data=None
                 )
@@ -442,7 +533,7 @@ class FitbitAdapter(BaseAdapter):
                     timestamp=dt,
                     date=dt.date(),
                     metadata={'activity_level': activity_level},
-                    raw_data=entry
+                    raw_data=None
                 )
         except Exception as e:
             self._log_error(f"Error parsing active minutes file {file.name}", e)
@@ -454,95 +545,86 @@ class FitbitAdapter(BaseAdapter):
     def _parse_sleep_score_csv(self, file: Path) -> Generator[ParsedRecord, None, None]:
         """Parse Sleep Score/sleep_score.csv."""
         try:
-            with open(file, 'r', newline='') as f:
-                reader = csv.DictReader(f)
+            for row in DataProcessor.load_csv_rows(file):
+                ts = self._parse_datetime(row['timestamp'], self.DATETIME_FORMATS + ['%Y-%m-%dT%H:%M:%SZ'])
+                if ts is None:
+                    continue
                 
-                for row in reader:
-                    ts = self._parse_datetime(row['timestamp'], self.DATETIME_FORMATS + ['%Y-%m-%dT%H:%M:%SZ'])
-                    if ts is None:
-                        continue
-                    
-                    score = row.get('overall_score', '')
-                    if not score:
-                        continue
-                    
-                    yield ParsedRecord(
-                        record_type='health_record',
-                        source=self.SOURCE_NAME,
-                        metric_type='sleep_score',
-                        value=float(score),
-                        unit='score',
-                        timestamp=ts,
-                        date=ts.date(),
-                        metadata={
-                            'composition_score': row.get('composition_score') or None,
-                            'revitalization_score': row.get('revitalization_score') or None,
-                            'duration_score': row.get('duration_score') or None,
-                            'deep_sleep_minutes': row.get('deep_sleep_in_minutes') or None,
-                            'resting_heart_rate': row.get('resting_heart_rate') or None,
-                            'restlessness': row.get('restlessness') or None,
-                        },
-                        raw_data=dict(row)
-                    )
+                score = row.get('overall_score', '')
+                if not score:
+                    continue
+                
+                yield ParsedRecord(
+                    record_type='health_record',
+                    source=self.SOURCE_NAME,
+                    metric_type='sleep_score',
+                    value=float(score),
+                    unit='score',
+                    timestamp=ts,
+                    date=ts.date(),
+                    metadata={
+                        'composition_score': row.get('composition_score') or None,
+                        'revitalization_score': row.get('revitalization_score') or None,
+                        'duration_score': row.get('duration_score') or None,
+                        'deep_sleep_minutes': row.get('deep_sleep_in_minutes') or None,
+                        'resting_heart_rate': row.get('resting_heart_rate') or None,
+                        'restlessness': row.get('restlessness') or None,
+                    },
+                    raw_data=row if self.store_raw else None
+                )
         except Exception as e:
             self._log_error(f"Error parsing sleep score CSV {file.name}", e)
     
     def _parse_stress_score_csv(self, file: Path) -> Generator[ParsedRecord, None, None]:
         """Parse Stress Score/Stress Score.csv."""
         try:
-            with open(file, 'r', newline='') as f:
-                reader = csv.DictReader(f)
+            for row in DataProcessor.load_csv_rows(file):
+                # Stress score files have DATE and STRESS_SCORE columns (check actual format)
+                date_str = row.get('DATE') or row.get('date') or row.get('timestamp')
+                score = row.get('STRESS_SCORE') or row.get('stress_score') or row.get('overall_score')
                 
-                for row in reader:
-                    # Stress score files have DATE and STRESS_SCORE columns (check actual format)
-                    date_str = row.get('DATE') or row.get('date') or row.get('timestamp')
-                    score = row.get('STRESS_SCORE') or row.get('stress_score') or row.get('overall_score')
-                    
-                    if not date_str or not score:
-                        continue
-                    
-                    dt = self._parse_datetime(date_str, self.DATETIME_FORMATS + ['%Y-%m-%dT%H:%M:%SZ'])
-                    if dt is None:
-                        continue
-                    
-                    yield ParsedRecord(
-                        record_type='health_record',
-                        source=self.SOURCE_NAME,
-                        metric_type='stress_score',
-                        value=float(score),
-                        unit='score',
-                        timestamp=dt,
-                        date=dt.date(),
-                        raw_data=dict(row)
-                    )
+                if not date_str or not score:
+                    continue
+                
+                dt = self._parse_datetime(date_str, self.DATETIME_FORMATS + ['%Y-%m-%dT%H:%M:%SZ'])
+                if dt is None:
+                    continue
+                
+                yield ParsedRecord(
+                    record_type='health_record',
+                    source=self.SOURCE_NAME,
+                    metric_type='stress_score',
+                    value=float(score),
+                    unit='score',
+                    timestamp=dt,
+                    date=dt.date(),
+                    raw_data=row if self.store_raw else None
+                )
         except Exception as e:
             self._log_error(f"Error parsing stress score CSV {file.name}", e)
     
     def _parse_azm_csv(self, file: Path) -> Generator[ParsedRecord, None, None]:
         """Parse Active Zone Minutes CSV files."""
         try:
-            with open(file, 'r', newline='') as f:
-                reader = csv.DictReader(f)
+            for row in DataProcessor.load_csv_rows(file):
+                dt = self._parse_datetime(row['date_time'], self.DATETIME_FORMATS)
+                if dt is None:
+                    continue
                 
-                for row in reader:
-                    dt = self._parse_datetime(row['date_time'], self.DATETIME_FORMATS)
-                    if dt is None:
-                        continue
-                    
-                    zone = row.get('heart_zone_id', 'unknown')
-                    minutes = row.get('total_minutes', 0)
-                    
-                    yield ParsedRecord(
-                        record_type='health_record',
-                        source=self.SOURCE_NAME,
-                        metric_type='active_minutes',
-                        value=float(minutes),
-                        unit='minutes',
-                        timestamp=dt,
-                        date=dt.date(),
-                        metadata={'heart_zone': zone},
-                        raw_data=dict(row)
-                    )
+                zone = row.get('heart_zone_id', 'unknown')
+                minutes = row.get('total_minutes', 0)
+                
+                yield ParsedRecord(
+                    record_type='health_record',
+                    source=self.SOURCE_NAME,
+                    metric_type='active_minutes',
+                    value=float(minutes),
+                    unit='minutes',
+                    timestamp=dt,
+                    date=dt.date(),
+                    metadata={'heart_zone': zone},
+                    raw_data=row if self.store_raw else None
+                )
         except Exception as e:
             self._log_error(f"Error parsing AZM CSV {file.name}", e)
 
@@ -562,25 +644,28 @@ class FitbitAdapter(BaseAdapter):
         try:
             df = DataProcessor.parse_daily_hrv_csv(file)
             
-            if df.empty:
+            if df.empty or 'rmssd' not in df.columns:
                 return
             
-            for _, row in df.iterrows():
-                rmssd = row.get('rmssd')
-                if pd.isna(rmssd):
+            for row in df.itertuples(index=False):
+                rmssd = row.rmssd
+                if rmssd != rmssd:
                     continue
                 
+                nremhr = getattr(row, 'nremhr', None)
+                entropy = getattr(row, 'entropy', None)
+                
                 yield ParsedRecord(
                     record_type='health_record',
                     source=self.SOURCE_NAME,
                     metric_type='hrv_rmssd',
                     value=float(rmssd),
                     unit='ms',
-                    timestamp=row['datetime'],
-                    date=row['date'],
+                    timestamp=row.datetime,
+                    date=row.date,
                     metadata={
-                        'nremhr': float(row['nremhr']) if pd.notna(row.get('nremhr')) else None,
-                        'entropy': float(row['entropy']) if pd.notna(row.get('entropy')) else None,
+                        'nremhr': _float_or_none(nremhr),
+                        'entropy': _float_or_none(entropy),
                         'aggregation': 'daily',
                     },
                     raw_data=None
@@ -600,29 +685,27 @@ class FitbitAdapter(BaseAdapter):
         try:
             df = DataProcessor.parse_daily_spo2_csv(file)
             
-            if df.empty:
+            if df.empty or 'average_value' not in df.columns:
                 return
             
-            for _, row in df.iterrows():
-                avg_value = row.get('average_value')
-                if pd.isna(avg_value):
-                    continue
-                
-                # Validate SpO2 range
-                if not DataProcessor.validate_spo2(avg_value):
-                    continue
+            # Drop missing and out-of-range readings (NaN fails the range check)
+            df = df[DataProcessor.validate_spo2(df['average_value'])]
+            
+            for row in df.itertuples(index=False):
+                lower_bound = getattr(row, 'lower_bound', None)
+                upper_bound = getattr(row, 'upper_bound', None)
                 
                 yield ParsedRecord(
                     record_type='health_record',
                     source=self.SOURCE_NAME,
                     metric_type='spo2',
-                    value=float(avg_value),
+                    value=float(row.average_value),
                     unit='%',
-                    timestamp=row['datetime'],
-                    date=row['date'],
+                    timestamp=row.datetime,
+                    date=row.date,
                     metadata={
-                        'lower_bound': float(row['lower_bound']) if pd.notna(row.get('lower_bound')) else None,
-                        'upper_bound': float(row['upper_bound']) if pd.notna(row.get('upper_bound')) else None,
+                        'lower_bound': _float_or_none(lower_bound),
+                        'upper_bound': _float_or_none(upper_bound),
                         'aggregation': 'daily',
                     },
                     raw_data=None
@@ -655,17 +738,25 @@ class FitbitAdapter(BaseAdapter):
             if not score_col:
                 return
             
-            for _, row in df.iterrows():
-                score = row.get(score_col)
-                if pd.isna(score):
+            # Sub-components to capture, where the file has them, converted
+            # up front to lists of floats (NaN where missing)
+            subs = {
+                sub: df[sub].astype(float).tolist()
+                for sub in ['hrv_subcomponent', 'sleep_subcomponent', 'activity_subcomponent']
+                if sub in df.columns
+            }
+            
+            for i, row in enumerate(df.itertuples(index=False)):
+                score = getattr(row, score_col)
+                if score != score:
                     continue
                 
                 metadata = {'aggregation': 'daily'}
                 
-                # Capture sub-components if available
-                for sub in ['hrv_subcomponent', 'sleep_subcomponent', 'activity_subcomponent']:
-                    if sub in row and pd.notna(row.get(sub)):
-                        metadata[sub] = float(row[sub])
+                for sub, values in subs.items():
+                    value = values[i]
+                    if value == value:
+                        metadata[sub] = value
                 
                 yield ParsedRecord(
                     record_type='health_record',
@@ -673,8 +764,8 @@ class FitbitAdapter(BaseAdapter):
                     metric_type='readiness_score',
                     value=float(score),
                     unit='score',
-                    timestamp=row['datetime'],
-                    date=row['date'],
+                    timestamp=row.datetime,
+                    date=row.date,
                     metadata=metadata,
                     raw_data=None
                 )
@@ -704,8 +795,7 @@ class FitbitAdapter(BaseAdapter):
             if not date_col:
                 return
             
-            df['datetime'] = df[date_col].apply(DataProcessor.parse_datetime)
-            df = df.dropna(subset=['datetime'])
+            df['datetime'] = DataProcessor.parse_datetime_series(df[date_col])
             
             # Find temperature column
             temp_col = None
@@ -717,19 +807,17 @@ class FitbitAdapter(BaseAdapter):
             if not temp_col:
                 return
             
-            for _, row in df.iterrows():
-                temp = row.get(temp_col)
-                if pd.isna(temp):
-                    continue
-                
+            df = df.dropna(subset=['datetime', temp_col])
+            
+            for timestamp, temp in zip(df['datetime'], df[temp_col].tolist()):
                 yield ParsedRecord(
                     record_type='health_record',
                     source=self.SOURCE_NAME,
                     metric_type='skin_temperature',
                     value=float(temp),
                     unit='°C',  # Usually relative deviation
-                    timestamp=row['datetime'],
-                    date=row['datetime'].date(),
+                    timestamp=timestamp,
+                    date=timestamp.date(),
                     metadata={'aggregation': 'nightly'},
                     raw_data=None
                 )
@@ -745,45 +833,68 @@ class FitbitAdapter(BaseAdapter):
         - overall_score: Sleep score
         - deep_sleep_minutes, rem_sleep_percent, etc.
         - score_time: When the sleep ended (used as date reference)
+        
+        Skipped unread if an earlier import already parsed the same file.
         """
         try:
-            df = pd.read_csv(file)
-            
-            if df.empty:
+            fingerprint = self._file_fingerprint(file)
+            if self._seen_before(fingerprint):
                 return
             
-            for _, row in df.iterrows():
-                # Parse the score_time to get the date
-                score_time_str = row.get('score_time')
-                if pd.isna(score_time_str):
-                    continue
-                
-                # Parse datetime like "2025-10-08 08:43:30+0000"
-                try:
-                    dt = pd.to_datetime(score_time_str, format='%Y-%m-%d %H:%M:%S%z')
-                    if dt is None:
+            # Skip the score breakdown columns (a callable usecols tolerates
+            # exports that lack one of them), and read in chunks so memory
+            # stays bounded however many years the export covers
+            reader = pd.read_csv(
+                file,
+                usecols=SLEEP_SCORE_DTYPES.__contains__,
+                dtype=SLEEP_SCORE_DTYPES,
+                chunksize=SLEEP_SCORE_CHUNK_SIZE,
+            )
+            with reader:
+                for df in reader:
+                    if df.empty:
                         continue
-                    target_date = dt.date()
-                except Exception:
-                    continue
-                
-                # Extract resting heart rate
-                rhr = row.get('resting_heart_rate')
-                if not pd.isna(rhr) and float(rhr) > 0:
-                    yield ParsedRecord(
-                        record_type='health_record',
-                        source=self.SOURCE_NAME,
-                        metric_type='resting_heart_rate',
-                        value=float(rhr),
-                        unit='bpm',
-                        timestamp=dt.to_pydatetime(),
-                        date=target_date,
-                        metadata={
-                            'source_file': 'UserSleepScores',
-                            'sleep_id': str(row.get('sleep_id', '')),
-                        },
-                        raw_data=None
-                    )
+                    
+                    # Rows without a score time or resting heart rate yield nothing
+                    if 'score_time' not in df.columns or 'resting_heart_rate' not in df.columns:
+                        return
+                    
+                    # Parse datetimes like "2025-10-08 08:43:30+0000" in one pass
+                    score_times = df['score_time']
+                    try:
+                        times = pd.to_datetime(score_times, format=SCORE_TIME_FORMAT, errors='coerce')
+                    except ValueError:
+                        # Mixed UTC offsets can't share a column; keep each row's own
+                        times = score_times.map(_parse_score_time)
+                    
+                    # Keep rows with a score time and a positive resting heart rate
+                    rhr = df['resting_heart_rate']
+                    keep = times.notna() & (rhr > 0)
+                    if 'sleep_id' in df.columns:
+                        sleep_ids = [str(sleep_id) for sleep_id in df['sleep_id'][keep].tolist()]
+                    else:
+                        sleep_ids = [''] * int(keep.sum())
+                    
+                    timestamps = times[keep]
+                    if timestamps.dtype != object:
+                        timestamps = timestamps.dt.to_pydatetime()
+                    
+                    for dt, value, sleep_id in zip(timestamps, rhr[keep].tolist(), sleep_ids):
+                        yield ParsedRecord(
+                            record_type='health_record',
+                            source=self.SOURCE_NAME,
+                            metric_type='resting_heart_rate',
+                            value=value,
+                            unit='bpm',
+                            timestamp=dt,
+                            date=dt.date(),
+                            metadata={
+                                'source_file': 'UserSleepScores',
+                                'sleep_id': sleep_id,
+                            },
+                            raw_data=None
+                        )
+            self.file_fingerprints.append(fingerprint)
         except Exception as e:
             self._log_error(f"Error parsing UserSleepScores CSV {file.name}", e)
 
@@ -801,8 +912,9 @@ class FitbitAdapter(BaseAdapter):
             with open(file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
-            # Group by date in case there are multiple entries per day
-            daily_totals = {}
+            # Group by date in case there are multiple entries per day:
+            # date -> [calories, protein, carbs, fat, fiber, sodium, entries]
+            daily_totals = defaultdict(lambda: [0, 0, 0, 0, 0, 0, 0])
             
             for entry in data:
                 log_date = entry.get('logDate')
@@ -810,53 +922,45 @@ class FitbitAdapter(BaseAdapter):
                     continue
                 
                 try:
-                    d = datetime.strptime(log_date, '%Y-%m-%d').date()
+                    d = date.fromisoformat(log_date)
                 except ValueError:
                     continue
                 
                 nutrition = entry.get('nutritionalValues', {})
                 
-                if d not in daily_totals:
-                    daily_totals[d] = {
-                        'calories': 0,
-                        'protein': 0,
-                        'carbs': 0,
-                        'fat': 0,
-                        'fiber': 0,
-                        'sodium': 0,
-                        'entries': 0
-                    }
-                
                 # Accumulate values (in case of multiple meals)
-                daily_totals[d]['calories'] += nutrition.get('calories', 0) or 0
-                daily_totals[d]['protein'] += nutrition.get('protein', 0) or 0
-                daily_totals[d]['carbs'] += nutrition.get('carbs', 0) or 0
-                daily_totals[d]['fat'] += nutrition.get('fat', 0) or 0
-                daily_totals[d]['fiber'] += nutrition.get('fiber', 0) or 0
-                daily_totals[d]['sodium'] += nutrition.get('sodium', 0) or 0
-                daily_totals[d]['entries'] += 1
-            
-            # Yield a record for each day
-            for d, totals in sorted(daily_totals.items()):
-                if totals['calories'] <= 0:
+                totals = daily_totals[d]
+                totals[0] += nutrition.get('calories') or 0
+                totals[1] += nutrition.get('protein') or 0
+                totals[2] += nutrition.get('carbs') or 0
+                totals[3] += nutrition.get('fat') or 0
+                totals[4] += nutrition.get('fiber') or 0
+                totals[5] += nutrition.get('sodium') or 0
+                totals[6] += 1
+            
+            # Yield a record for each day, in file order; each carries its
+            # own date, so nothing downstream needs them sorted
+            for d, totals in daily_totals.items():
+                calories, protein, carbs, fat, fiber, sodium, entries = totals
+                if calories <= 0:
                     continue
                 
                 yield ParsedRecord(
                     record_type='nutrition',
                     source=self.SOURCE_NAME,
                     metric_type='nutrition_daily',
-                    value=float(totals['calories']),
+                    value=float(calories),
                     unit='kcal',
-                    timestamp=datetime.combine(d, datetime.min.time()),
+                    timestamp=datetime.combine(d, MIDNIGHT),
                     date=d,
                     metadata={
-                        'calories': float(totals['calories']),
-                        'protein_g': round(totals['protein'], 2),
-                        'carbs_g': round(totals['carbs'], 2),
-                        'fat_g': round(totals['fat'], 2),
-                        'fiber_g': round(totals['fiber'], 2),
-                        'sodium_mg': round(totals['sodium'], 2),
-                        'meal_entries': totals['entries'],
+                        'calories': float(calories),
+                        'protein_g': round(protein, 2),
+                        'carbs_g': round(carbs, 2),
+                        'fat_g': round(fat, 2),
+                        'fiber_g': round(fiber, 2),
+                        'sodium_mg': round(sodium, 2),
+                        'meal_entries': entries,
                         'data_source': 'cronometer'
                     },
                     raw_data=None
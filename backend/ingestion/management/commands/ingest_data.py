@@ -4,13 +4,16 @@ Management command to ingest data from a local directory.
 Usage:
     python manage.py ingest_data /path/to/fitbit/export --source fitbit
     python manage.py ingest_data /path/to/data --source fitbit --dry-run
+    python manage.py ingest_data /path/to/data --cache-dir /var/cache/ingestion
 """
 
+import os
 from pathlib import Path
 from django.core.management.base import BaseCommand, CommandError
 
 from ingestion.services import IngestionService
 from ingestion.adapters.base import AdapterRegistry
+from ingestion.adapters.data_processor import DataProcessor
 
 
 class Command(BaseCommand):
@@ -33,11 +36,27 @@ class Command(BaseCommand):
             action='store_true',
             help='Parse and show stats without saving to database'
         )
+        parser.add_argument(
+            '--cache-dir',
+            type=str,
+            default=os.environ.get('INGESTION_CACHE_DIR'),
+            help='Cache parsed minute-level files here, so re-imports of '
+                 'unchanged files skip parsing (default: $INGESTION_CACHE_DIR)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processes for aggregating minute-level files (default: one per CPU)'
+        )
 
     def handle(self, *args, **options):
         path = Path(options['path'])
         source = options.get('source')
         dry_run = options.get('dry_run', False)
+        if options['cache_dir']:
+            DataProcessor.cache_dir = Path(options['cache_dir'])
+        DataProcessor.max_workers = options['workers']
         
         if not path.exists():
             raise CommandError(f"Path does not exist: {path}")
@@ -88,11 +107,11 @@ class Command(BaseCommand):
             self.stdout.write(f"  {mtype}: {count}")
         
         if result.errors:
-            self.stdout.write(self.style.WARNING(f"\nErrors ({len(result.errors)}):"))
+            self.stdout.write(self.style.WARNING(f"\nErrors ({result.error_count}):"))
             for error in result.errors[:10]:
                 self.stdout.write(f"  - {error}")
-            if len(result.errors) > 10:
-                self.stdout.write(f"  ... and {len(result.errors) - 10} more")
+            if result.error_count > 10:
+                self.stdout.write(f"  ... and {result.error_count - 10} more")
     
     def _ingest(self, path: Path, source: str | None):
         """Actually ingest data to the database."""
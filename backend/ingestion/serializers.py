@@ -143,6 +143,28 @@ class DataImportLogSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class DateRangeFilterSerializer(serializers.Serializer):
+    """Query params shared by the date-filtered list endpoints."""
+    
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+
+class HealthRecordFilterSerializer(DateRangeFilterSerializer):
+    """Query params for filtering health records."""
+    
+    metric_type = serializers.CharField(required=False, allow_blank=True)
+    source = serializers.CharField(required=False, allow_blank=True)
+    date = serializers.DateField(required=False)
+
+
+class BloodworkFilterSerializer(DateRangeFilterSerializer):
+    """Query params for filtering bloodwork results."""
+    
+    biomarker = serializers.CharField(required=False, allow_blank=True)
+    flagged_only = serializers.BooleanField(required=False)
+
+
 class FileUploadSerializer(serializers.Serializer):
     """Serializer for file upload requests."""
     
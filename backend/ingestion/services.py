@@ -2,12 +2,19 @@
 Ingestion service - orchestrates parsing and saving data to the database.
 """
 
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import date, datetime
+from functools import partial
+from hashlib import blake2b
+from operator import attrgetter
 from pathlib import Path
+from typing import Optional
+from urllib.parse import urlencode
 from uuid import uuid4, UUID
 import logging
 
-from django.db import transaction
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
 from django.contrib.auth.models import User
 
 from core.models import (
@@ -17,12 +24,85 @@ from core.models import (
     DataImportLog,
     DataSource
 )
+from core.cache import bump_generation, get_generation, is_shared as cache_is_shared
 from core.services import DailySummaryService
 from .adapters.base import BaseAdapter, ParsedRecord, AdapterRegistry
 
 logger = logging.getLogger(__name__)
 
 
+@contextmanager
+def bulk_ingest_session(work_mem: str = '64MB'):
+    """
+    Transaction tuned for bulk loads.
+    
+    synchronous_commit is off for this transaction only, so the commit
+    doesn't wait on the WAL flush: a crash can lose the last few batches,
+    and imports can simply be re-run.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL synchronous_commit = OFF")
+            cursor.execute("SET LOCAL work_mem = %s", [work_mem])
+        yield
+
+
+class RecordStatsCache:
+    """
+    Cache for aggregate API responses over the raw record tables.
+    
+    Entries are keyed by a per-table generation, the requesting user and
+    the request's query params; writing to the table bumps the generation, orphaning every
+    cached response for it. Every write path bumps it once: the API
+    viewsets, the admin and bulk imports. (Model signals would do it per
+    row, and a post_delete receiver disables fast deletes.)
+    
+    A per-process cache would miss bumps made by other processes, so
+    responses are only cached when the backend is shared.
+    """
+    
+    TIMEOUT = 5 * 60
+    
+    @staticmethod
+    def _generation_key(name: str) -> str:
+        return f'record_stats_gen:{name}'
+    
+    @classmethod
+    def invalidate(cls, name: str):
+        """Drop cached responses for a table after its rows change."""
+        bump_generation(cls._generation_key(name))
+    
+    @classmethod
+    def etag(cls, name: str, request) -> Optional[str]:
+        """
+        Version of the response for this user and query params; changes
+        whenever the table does, so it doubles as an HTTP ETag.
+        
+        None without a shared cache, where another process's writes would
+        go unseen and clients would be told stale data is current.
+        """
+        if not cache_is_shared():
+            return None
+        generation = get_generation(cls._generation_key(name))
+        params = urlencode(sorted(request.GET.lists()), doseq=True)
+        digest = blake2b(
+            f'{request.user.pk}?{params}'.encode(),
+            digest_size=16,
+        ).hexdigest()
+        return f'{generation}-{digest}'
+    
+    @classmethod
+    def get_or_set(cls, name: str, request, compute):
+        """Return compute() through the cache, keyed on the user and query params."""
+        if not cache_is_shared():
+            return compute()
+        return cache.get_or_set(
+            f'record_stats:{name}:{cls.etag(name, request)}',
+            compute,
+            cls.TIMEOUT,
+        )
+
+
 class IngestionService:
     """
     Service for ingesting data from various sources into the database.
@@ -34,10 +114,28 @@ class IngestionService:
         result = service.ingest_from_adapter(adapter, path)
     """
     
+    # Rows per INSERT statement when saving parsed records
+    BULK_BATCH_SIZE = 1000
+    
+    # Unique-constraint key of each model, minus user (the same for every
+    # row of an import); the first record with a key wins, as in the DB
+    CONFLICT_KEYS = {
+        HealthRecord: attrgetter('source', 'metric_type', 'timestamp'),
+        SleepLog: attrgetter('source', 'source_log_id'),
+        NutritionLog: attrgetter('source', 'date'),
+    }
+    
     def __init__(self, user: User | None = None):
         self.user = user
         self.batch_id: UUID | None = None
         self.import_log: DataImportLog | None = None
+        # record_type -> builder for its unsaved model instance
+        self._builders = {
+            'health_record': self._build_health_record,
+            'sleep_log': self._build_sleep_log,
+            'nutrition_log': self._build_nutrition_log,
+            'nutrition': self._build_nutrition_log,
+        }
     
     def ingest_file(
         self, 
@@ -77,10 +175,10 @@ class IngestionService:
             if adapter is None:
                 raise ValueError(f"No adapter found for path: {path}")
             
-            # Update source if it was auto-detected
+            # Record the auto-detected source; it is written out with the
+            # rest of the log once the import finishes or fails
             if not source:
                 self.import_log.source = adapter.SOURCE_NAME
-                self.import_log.save()
             
             return self._process_with_adapter(adapter, path)
             
@@ -128,37 +226,78 @@ class IngestionService:
         path: Path
     ) -> DataImportLog:
         """Process a path with the given adapter."""
+        adapter.fingerprint_lookup = partial(self._fingerprint_known, adapter.SOURCE_NAME)
+        if path.is_dir() and hasattr(adapter, 'already_ingested_dates'):
+            adapter.already_ingested_dates = self._ingested_dates(adapter.SOURCE_NAME)
         result = adapter.parse(path)
+        parse_errors = len(result.errors)
         
-        records_created = 0
+        # Unsaved model instances, grouped by model for bulk inserts, and
+        # the conflict keys already queued so repeats never reach the DB
+        pending = {model: [] for model in self.CONFLICT_KEYS}
+        seen = {model: set() for model in self.CONFLICT_KEYS}
         records_skipped = 0
-        dates_affected = set()  # Track dates for summary building
+        for record in result.records:
+            try:
+                instance = self._build_instance(record)
+            except Exception as e:
+                logger.warning(f"Failed to save record: {e}")
+                records_skipped += 1
+                result.errors.append(str(e))
+                continue
+            if instance is None:
+                records_skipped += 1
+                continue
+            model = type(instance)
+            key = self.CONFLICT_KEYS[model](instance)
+            if key in seen[model]:
+                records_skipped += 1
+                continue
+            seen[model].add(key)
+            pending[model].append(instance)
+        
+        # Insert in bulk; rows matching an existing record are left alone
+        for model, instances in pending.items():
+            self._bulk_insert(model, instances, result.errors)
         
-        # Process records in batches
-        with transaction.atomic():
-            for record in result.records:
-                try:
-                    created = self._save_record(record)
-                    if created:
-                        records_created += 1
-                        # Track the date for summary building
-                        if record.date:
-                            dates_affected.add(record.date)
-                    else:
-                        records_skipped += 1
-                except Exception as e:
-                    logger.warning(f"Failed to save record: {e}")
-                    records_skipped += 1
-                    result.errors.append(str(e))
+        # Rows that made it in carry this batch's id (a conflicting row
+        # keeps its original one), which also gives the dates to summarise
+        records_created = 0
+        dates_affected = set()
+        for model, date_field in (
+            (HealthRecord, 'date'),
+            (SleepLog, 'date_of_sleep'),
+            (NutritionLog, 'date'),
+        ):
+            if not pending[model]:
+                continue
+            created = model.objects.filter(import_batch_id=self.batch_id)
+            records_created += created.count()
+            dates_affected.update(
+                created.filter(**{f'{date_field}__isnull': False})
+                .values_list(date_field, flat=True)
+                .distinct()
+            )
+        records_skipped += sum(map(len, pending.values())) - records_created
+        if records_created:
+            RecordStatsCache.invalidate('health_records')
+        
+        # Rows that failed to build or insert can't be traced to their file,
+        # so files only count as imported when every row went in
+        rows_saved = len(result.errors) == parse_errors
         
-        # Build daily summaries for affected dates
+        # Build daily summaries for affected dates; days that fail to save
+        # are reported in the import's errors
+        summaries_built = 0
         if dates_affected:
             logger.info(f"Building daily summaries for {len(dates_affected)} dates...")
-            for d in sorted(dates_affected):
-                try:
-                    DailySummaryService.build_summary(d, self.user)
-                except Exception as e:
-                    logger.warning(f"Failed to build summary for {d}: {e}")
+            try:
+                summaries_built = len(DailySummaryService.build_summaries(
+                    dates_affected, self.user, errors=result.errors
+                ))
+            except Exception as e:
+                logger.warning(f"Failed to build daily summaries: {e}")
+                result.errors.append(f"Failed to build daily summaries: {e}")
         
         # Update import log
         self.import_log.status = 'completed' if result.success else 'completed'
@@ -166,99 +305,140 @@ class IngestionService:
         self.import_log.records_created = records_created
         self.import_log.records_skipped = records_skipped
         self.import_log.errors = result.errors[:100]  # Limit stored errors
+        if rows_saved:
+            self.import_log.file_fingerprints = adapter.file_fingerprints or None
         self.import_log.completed_at = datetime.utcnow()
         self.import_log.save()
         
         logger.info(
             f"Import complete: {records_created} created, "
             f"{records_skipped} skipped, {len(result.errors)} errors, "
-            f"{len(dates_affected)} daily summaries updated"
+            f"{summaries_built} daily summaries updated"
         )
         
         return self.import_log
     
-    def _save_record(self, record: ParsedRecord) -> bool:
+    def _fingerprint_known(self, source: str, fingerprint: str) -> bool:
+        """Whether one of this user's completed imports parsed the file."""
+        return DataImportLog.objects.filter(
+            user=self.user,
+            source=source,
+            status='completed',
+            file_fingerprints__contains=[fingerprint],
+        ).exists()
+    
+    def _ingested_dates(self, source: str) -> set[date]:
         """
-        Save a ParsedRecord to the appropriate model.
+        Dates this user already has health records for from source.
+        
+        The latest one is left out, since the export it came from may have
+        been taken partway through that day.
+        """
+        dates = set(
+            HealthRecord.objects.filter(user=self.user, source=source)
+            .exclude(date__isnull=True)
+            .order_by()
+            .values_list('date', flat=True)
+            .distinct()
+        )
+        if dates:
+            dates.remove(max(dates))
+        return dates
+    
+    def _bulk_insert(self, model, instances: list, errors: list[str]) -> None:
+        """
+        INSERT ... ON CONFLICT DO NOTHING the instances, in batches.
+        
+        Each batch commits in its own transaction, so locks and WAL are
+        held for one batch at a time rather than the whole import. If a
+        batch fails (e.g. a NOT NULL column left empty), it is rolled back
+        and retried row by row, so one bad record is skipped and reported
+        instead of failing the whole import.
+        """
+        for start in range(0, len(instances), self.BULK_BATCH_SIZE):
+            batch = instances[start:start + self.BULK_BATCH_SIZE]
+            try:
+                with bulk_ingest_session():
+                    model.objects.bulk_create(batch, ignore_conflicts=True)
+            except DatabaseError:
+                for instance in batch:
+                    try:
+                        with bulk_ingest_session():
+                            model.objects.bulk_create([instance], ignore_conflicts=True)
+                    except DatabaseError as e:
+                        logger.warning(f"Failed to save record: {e}")
+                        errors.append(str(e))
+    
+    def _build_instance(self, record: ParsedRecord):
+        """
+        Build the unsaved model instance for a ParsedRecord.
         
         Returns:
-            True if record was created, False if skipped (duplicate)
+            HealthRecord, SleepLog or NutritionLog, or None for an
+            unknown record type
         """
-        if record.record_type == 'health_record':
-            return self._save_health_record(record)
-        elif record.record_type == 'sleep_log':
-            return self._save_sleep_log(record)
-        elif record.record_type in ('nutrition_log', 'nutrition'):
-            return self._save_nutrition_log(record)
-        else:
+        builder = self._builders.get(record.record_type)
+        if builder is None:
             logger.warning(f"Unknown record type: {record.record_type}")
-            return False
+            return None
+        return builder(record)
     
-    def _save_health_record(self, record: ParsedRecord) -> bool:
-        """Save a health metric record."""
-        _, created = HealthRecord.objects.get_or_create(
+    def _build_health_record(self, record: ParsedRecord) -> HealthRecord:
+        """Build a health metric record."""
+        return HealthRecord(
             user=self.user,
             source=record.source,
             metric_type=record.metric_type,
             timestamp=record.timestamp,
-            defaults={
-                'value': record.value,
-                'unit': record.unit,
-                'date': record.date,
-                'metadata': record.metadata,
-                'raw_data': record.raw_data,
-                'import_batch_id': self.batch_id,
-            }
+            value=record.value,
+            unit=record.unit,
+            date=record.date,
+            metadata=record.metadata or None,
+            raw_data=record.raw_data,
+            import_batch_id=self.batch_id,
         )
-        return created
     
-    def _save_sleep_log(self, record: ParsedRecord) -> bool:
-        """Save a sleep session record."""
-        sleep_data = record.sleep_data
+    def _build_sleep_log(self, record: ParsedRecord) -> SleepLog:
+        """Build a sleep session record."""
+        sleep_data = record.sleep_data or {}
         
-        _, created = SleepLog.objects.get_or_create(
+        return SleepLog(
             user=self.user,
             source=record.source,
             source_log_id=sleep_data.get('source_log_id', ''),
-            defaults={
-                'date_of_sleep': record.date,
-                'start_time': record.start_time,
-                'end_time': record.end_time,
-                'duration_minutes': record.duration_minutes or 0,
-                'minutes_asleep': sleep_data.get('minutes_asleep'),
-                'minutes_awake': sleep_data.get('minutes_awake'),
-                'efficiency': sleep_data.get('efficiency'),
-                'deep_sleep_minutes': sleep_data.get('deep_sleep_minutes'),
-                'light_sleep_minutes': sleep_data.get('light_sleep_minutes'),
-                'rem_sleep_minutes': sleep_data.get('rem_sleep_minutes'),
-                'stages_data': sleep_data.get('stages_data'),
-                'raw_data': record.raw_data,
-                'import_batch_id': self.batch_id,
-            }
+            date_of_sleep=record.date,
+            start_time=record.start_time,
+            end_time=record.end_time,
+            duration_minutes=record.duration_minutes or 0,
+            minutes_asleep=sleep_data.get('minutes_asleep'),
+            minutes_awake=sleep_data.get('minutes_awake'),
+            efficiency=sleep_data.get('efficiency'),
+            deep_sleep_minutes=sleep_data.get('deep_sleep_minutes'),
+            light_sleep_minutes=sleep_data.get('light_sleep_minutes'),
+            rem_sleep_minutes=sleep_data.get('rem_sleep_minutes'),
+            stages_data=sleep_data.get('stages_data'),
+            raw_data=record.raw_data,
+            import_batch_id=self.batch_id,
         )
-        return created
     
-    def _save_nutrition_log(self, record: ParsedRecord) -> bool:
-        """Save a nutrition record."""
+    def _build_nutrition_log(self, record: ParsedRecord) -> NutritionLog:
+        """Build a nutrition record."""
         # Handle both nutrition_data dict and metadata dict formats
         nutrition_data = record.nutrition_data or record.metadata or {}
         
-        _, created = NutritionLog.objects.get_or_create(
+        return NutritionLog(
             user=self.user,
             source=record.source,
             date=record.date,
-            defaults={
-                'calories': nutrition_data.get('calories') or record.value,
-                'protein_g': nutrition_data.get('protein_g'),
-                'carbs_g': nutrition_data.get('carbs_g'),
-                'fat_g': nutrition_data.get('fat_g'),
-                'fiber_g': nutrition_data.get('fiber_g'),
-                'sugar_g': nutrition_data.get('sugar_g'),
-                'sodium_mg': nutrition_data.get('sodium_mg'),
-                'water_ml': nutrition_data.get('water_ml'),
-                'micronutrients': nutrition_data.get('micronutrients', {}),
-                'raw_data': record.raw_data,
-                'import_batch_id': self.batch_id,
-            }
+            calories=nutrition_data.get('calories') or record.value,
+            protein_g=nutrition_data.get('protein_g'),
+            carbs_g=nutrition_data.get('carbs_g'),
+            fat_g=nutrition_data.get('fat_g'),
+            fiber_g=nutrition_data.get('fiber_g'),
+            sugar_g=nutrition_data.get('sugar_g'),
+            sodium_mg=nutrition_data.get('sodium_mg'),
+            water_ml=nutrition_data.get('water_ml'),
+            micronutrients=nutrition_data.get('micronutrients'),
+            raw_data=record.raw_data,
+            import_batch_id=self.batch_id,
         )
-        return created
@@ -0,0 +1,412 @@
+import json
+import os
+import tempfile
+import time
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.models import DailySummary, HealthRecord
+from .adapters import FitbitAdapter
+from .adapters.base import BaseAdapter, ParsedRecord
+from .adapters.data_processor import DataProcessor
+from .services import IngestionService
+
+
+class _ListAdapter(BaseAdapter):
+    """Adapter yielding a fixed list of records, whatever the path."""
+
+    SOURCE_NAME = 'fitbit'
+
+    def __init__(self, records: list[ParsedRecord]):
+        super().__init__()
+        self.records = records
+
+    def can_handle(self, path: Path) -> bool:
+        return True
+
+    def _iter_records(self, path: Path):
+        yield from self.records
+
+
+def _steps(day: int, value: float) -> ParsedRecord:
+    return ParsedRecord(
+        record_type='health_record',
+        source='fitbit',
+        metric_type='steps',
+        value=value,
+        unit='steps',
+        timestamp=datetime(2024, 8, day, tzinfo=timezone.utc),
+        date=date(2024, 8, day),
+    )
+
+
+class IngestionServiceTests(TestCase):
+    """Records are deduplicated in the batch and against the database."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('ingest-test')
+
+    def _ingest(self, records: list[ParsedRecord]):
+        service = IngestionService(user=self.user)
+        return service.ingest_from_adapter(_ListAdapter(records), Path('export'))
+
+    def test_repeats_in_batch_are_skipped(self):
+        records = [
+            _steps(25, 1000),
+            _steps(25, 1000),
+            _steps(25, 2000),  # Same conflict key, the first one wins
+            _steps(26, 3000),
+            ParsedRecord(record_type='no_such_type', source='fitbit'),
+        ]
+
+        log = self._ingest(records)
+
+        self.assertEqual(log.status, 'completed')
+        self.assertEqual(log.records_processed, 5)
+        self.assertEqual(log.records_created, 2)
+        self.assertEqual(log.records_skipped, 3)
+        self.assertEqual(
+            list(HealthRecord.objects.filter(user=self.user)
+                 .order_by('date').values_list('value', flat=True)),
+            [1000, 3000],
+        )
+        self.assertEqual(
+            DailySummary.objects.get(user=self.user, date=date(2024, 8, 25)).steps,
+            1000,
+        )
+
+    def test_existing_rows_are_skipped(self):
+        self._ingest([_steps(25, 1000)])
+
+        log = self._ingest([_steps(25, 1000), _steps(26, 3000)])
+
+        self.assertEqual(log.records_created, 1)
+        self.assertEqual(log.records_skipped, 1)
+        self.assertEqual(HealthRecord.objects.filter(user=self.user).count(), 2)
+        # Only the new row carries this import's batch id
+        self.assertEqual(
+            HealthRecord.objects.filter(import_batch_id=log.batch_id).get().date,
+            date(2024, 8, 26),
+        )
+
+
+class IngestedDatesTests(TestCase):
+    """Directory imports skip export files whose dates are all ingested."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('ingested-dates-test')
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        global_data = self.root / 'Global Export Data'
+        global_data.mkdir()
+        # The first file runs up to the second one's date
+        for name, days in (('steps-2024-08-20.json', (20, 21)), ('steps-2024-08-22.json', (22,))):
+            (global_data / name).write_text(json.dumps([
+                {'dateTime': f'08/{day}/24 00:00:00', 'value': '5'} for day in days
+            ]))
+
+    def _ingest_with_existing(self, days):
+        HealthRecord.objects.bulk_create([
+            HealthRecord(
+                user=self.user,
+                source='fitbit',
+                metric_type='steps',
+                value=1000,
+                unit='steps',
+                timestamp=datetime(2024, 8, day, tzinfo=timezone.utc),
+                date=date(2024, 8, day),
+            )
+            for day in days
+        ])
+        return IngestionService(user=self.user).ingest_file(self.root, source='fitbit')
+
+    def test_fully_ingested_file_is_skipped(self):
+        log = self._ingest_with_existing([20, 21, 22, 23])
+
+        # Only the newest file is read
+        self.assertEqual(log.records_processed, 1)
+
+    def test_gap_in_span_reads_file(self):
+        log = self._ingest_with_existing([20, 22, 23])
+
+        self.assertEqual(log.records_processed, 3)
+        self.assertTrue(
+            HealthRecord.objects.filter(user=self.user, date=date(2024, 8, 21)).exists()
+        )
+
+
+class RecordStatsTests(TestCase):
+    """The summary endpoint's ETag changes with every write."""
+
+    URL = '/api/v1/health-records/summary/'
+
+    def _etag(self):
+        response = self.client.get(self.URL)
+        self.assertEqual(response.status_code, 200)
+        return response.headers['ETag']
+
+    def test_api_writes_change_etag(self):
+        etag = self._etag()
+        self.assertEqual(self.client.get(self.URL, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        response = self.client.post('/api/v1/health-records/', {
+            'source': 'fitbit',
+            'metric_type': 'steps',
+            'value': 1000,
+            'unit': 'steps',
+            'timestamp': '2024-08-25T00:00:00Z',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertNotEqual(self._etag(), etag)
+
+        etag = self._etag()
+        self.client.delete(f"/api/v1/health-records/{response.json()['id']}/")
+        self.assertNotEqual(self._etag(), etag)
+
+
+class PruneCacheTests(SimpleTestCase):
+    """The minute-data cache only ever removes its own files."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        patcher = patch.object(DataProcessor, 'cache_dir', self.dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _make(self, name: str, age_days: int = 0, size: int = 1) -> Path:
+        path = self.dir / name
+        path.write_bytes(b'x' * size)
+        mtime = time.time() - age_days * 24 * 60 * 60
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_removes_only_stale_cache_files(self):
+        stale = self._make('stale.pkl', age_days=60)
+        stale_tmp = self._make('stale.123.tmp', age_days=60)
+        fresh = self._make('fresh.pkl')
+        other = self._make('notes.txt', age_days=60)
+        (self.dir / 'old.pkl').mkdir()
+        os.utime(self.dir / 'old.pkl', (0, 0))
+
+        DataProcessor._prune_cache()
+
+        self.assertFalse(stale.exists())
+        self.assertFalse(stale_tmp.exists())
+        self.assertTrue(fresh.exists())
+        self.assertTrue(other.exists())
+        self.assertTrue((self.dir / 'old.pkl').is_dir())
+
+    def test_evicts_least_recently_used_over_size_cap(self):
+        older = self._make('older.pkl', age_days=2, size=600)
+        newer = self._make('newer.pkl', age_days=1, size=600)
+
+        with patch.object(DataProcessor, 'CACHE_MAX_BYTES', 1000):
+            DataProcessor._prune_cache()
+
+        self.assertFalse(older.exists())
+        self.assertTrue(newer.exists())
+
+
+class FitbitStoreRawTests(SimpleTestCase):
+    """raw_data storage follows FITBIT_STORE_RAW unless set explicitly."""
+
+    def test_setting_read_at_parse_time(self):
+        adapter = FitbitAdapter()
+        with override_settings(FITBIT_STORE_RAW=True):
+            self.assertTrue(adapter.store_raw)
+        with override_settings(FITBIT_STORE_RAW=False):
+            self.assertFalse(adapter.store_raw)
+
+    @override_settings(FITBIT_STORE_RAW=True)
+    def test_explicit_argument_wins(self):
+        self.assertFalse(FitbitAdapter(store_raw=False).store_raw)
+
+
+class AggregateAllFilesTests(SimpleTestCase):
+    """aggregate_all_files() survives a pool whose workers die."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.jobs = {}
+        for day in (25, 26):
+            path = Path(tmp.name) / f'steps-2024-08-{day}.json'
+            path.write_text(
+                f'[{{"dateTime": "08/{day}/24 10:00:00", "value": "10"}},'
+                f' {{"dateTime": "08/{day}/24 10:01:00", "value": "5"}}]'
+            )
+            self.jobs[path] = 'aggregate_steps_json'
+
+    def test_broken_pool_falls_back_in_process(self):
+        class BrokenExecutor:
+            def __init__(self, **kwargs):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+            def submit(self, fn, *args):
+                raise BrokenProcessPool('worker died')
+
+        with patch('ingestion.adapters.data_processor.ProcessPoolExecutor', BrokenExecutor), \
+                self.assertLogs('ingestion.adapters.data_processor', 'WARNING'):
+            results = DataProcessor.aggregate_all_files(self.jobs, max_workers=2)
+
+        self.assertEqual(list(results), list(self.jobs))
+        for path, df in results.items():
+            self.assertEqual(df['total_steps'].tolist(), [15])
+
+
+def _scalar_parse_datetime(value):
+    """parse_datetime() as it was before parsing was vectorized."""
+    if not value:
+        return None
+    for fmt in DataProcessor.DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    try:
+        return pd.to_datetime(value).to_pydatetime()
+    except Exception:
+        return None
+
+
+class ParseDatetimeSeriesTests(SimpleTestCase):
+    """parse_datetime_series() matches parsing each value on its own."""
+
+    VALUES = [
+        '2024-08-25T03:44:00.000',
+        '2024-08-25T03:44:00',
+        '2024-08-25',
+        '2024-08-25T03:44:00Z',
+        '2024-07-27T10:56',
+        '07/27/24 06:53:41',
+        '2024-08-25 03:44:00+02:00',  # Only the pandas fallback parses this
+        '',
+        None,
+        np.nan,
+        'garbage',
+    ]
+
+    def _expected(self, values) -> list:
+        expected = []
+        for value in values:
+            parsed = _scalar_parse_datetime(value) if isinstance(value, str) else None
+            # Offset-aware results keep their wall-clock time
+            expected.append(pd.Timestamp(parsed.replace(tzinfo=None)) if parsed else pd.NaT)
+        return expected
+
+    def _assert_matches_scalar(self, values: pd.Series):
+        # Unparseable values log a warning, once each (parse_datetime is cached)
+        with patch('ingestion.adapters.data_processor.logger'):
+            parsed = DataProcessor.parse_datetime_series(values)
+        self.assertEqual(parsed.index.tolist(), values.index.tolist())
+        self.assertEqual(
+            [None if pd.isna(v) else v for v in parsed.tolist()],
+            [None if pd.isna(v) else v for v in self._expected(values.tolist())],
+        )
+
+    def test_mixed_formats_object_dtype(self):
+        self._assert_matches_scalar(pd.Series(self.VALUES, dtype=object))
+
+    def test_inferred_str_dtype(self):
+        # pandas 3 infers the str dtype for a list of strings, with NaN
+        # standing in for missing values
+        values = pd.Series([v for v in self.VALUES if v is not None and v is not np.nan])
+        self._assert_matches_scalar(values)
+
+    def test_leading_format_is_not_the_only_one_tried(self):
+        values = pd.Series(['07/27/24 06:53:41', '2024-08-25T03:44:00Z', '2024-08-25', 'bad'])
+        self._assert_matches_scalar(values)
+
+    def test_nothing_to_parse(self):
+        parsed = DataProcessor.parse_datetime_series(pd.Series(['', None], dtype=object))
+        self.assertTrue(parsed.isna().all())
+
+
+class ToNumericTests(SimpleTestCase):
+    """to_numeric() matches pd.to_numeric(errors='coerce')."""
+
+    VALUES = ['1', '2.5', '1e3', '-4', '1', 'abc', '', 'NaN', '2.5']
+
+    def _assert_matches_pandas(self, values: pd.Series):
+        pd.testing.assert_series_equal(
+            DataProcessor.to_numeric(values),
+            pd.to_numeric(values, errors='coerce'),
+            check_dtype=False,
+        )
+
+    def test_inferred_str_dtype(self):
+        self._assert_matches_pandas(pd.Series(self.VALUES + [None]))
+
+    def test_object_dtype(self):
+        self._assert_matches_pandas(pd.Series(self.VALUES + [None, np.nan, 7, 3.5], dtype=object))
+
+    def test_already_numeric(self):
+        self._assert_matches_pandas(pd.Series([1, 2, 2, 3]))
+        self._assert_matches_pandas(pd.Series([1.5, np.nan, 1.5]))
+
+    def test_unhashable_values(self):
+        self._assert_matches_pandas(pd.Series([{'value': 1}, '2'], dtype=object))
+
+
+class AggregateByDayTests(SimpleTestCase):
+    """_aggregate_by_day() matches grouping on a column of date objects."""
+
+    AGGS = {
+        'value': ('value', 'sum'),
+        'mean_value': ('value', 'mean'),
+        'record_count': ('value', 'count'),
+        'min_value': ('value', 'min'),
+        'max_value': ('value', 'max'),
+        'first_time': ('datetime', 'min'),
+        'last_time': ('datetime', 'max'),
+    }
+
+    def _frame(self) -> pd.DataFrame:
+        datetimes = pd.Series(
+            ['2024-08-25T23:59:00', '2024-08-25T00:00:00', '2024-08-26T12:30:00',
+             '', '2024-08-26T12:31:00', '2024-08-28T00:00:00', '2024-08-25T08:00:00'],
+        )
+        values = pd.Series(['10', '5', 'x', '3', '', '7', '2.5'])
+        with patch('ingestion.adapters.data_processor.logger'):
+            datetime_col = DataProcessor.parse_datetime_series(datetimes)
+        return pd.DataFrame({
+            'datetime': datetime_col,
+            'value': DataProcessor.to_numeric(values),
+        })
+
+    def _scalar_aggregate(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = df.dropna(subset=['datetime']).copy()
+        df['date'] = df['datetime'].dt.date
+        return df.groupby('date').agg(**self.AGGS).reset_index()
+
+    def test_matches_date_object_grouping(self):
+        df = self._frame()
+        pd.testing.assert_frame_equal(
+            DataProcessor._aggregate_by_day(df, **self.AGGS),
+            self._scalar_aggregate(df),
+        )
+
+    def test_day_without_values(self):
+        """Days whose values are all missing keep a row with a zero count."""
+        df = self._frame()
+        df.loc[df['datetime'].dt.day == 28, 'value'] = np.nan
+        result = DataProcessor._aggregate_by_day(df, **self.AGGS)
+
+        pd.testing.assert_frame_equal(result, self._scalar_aggregate(df))
+        self.assertEqual(result.set_index('date').loc[date(2024, 8, 28), 'record_count'], 0)
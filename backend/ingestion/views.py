@@ -2,16 +2,24 @@
 REST API views for the ingestion module.
 """
 
+import os
+import shutil
 import tempfile
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import blake2b
 from pathlib import Path
 from uuid import uuid4
 
 from django.db.models import Count, Min, Max, Avg
 from django.db.models.functions import TruncDate
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import etag
 from rest_framework import viewsets, status, views
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import AllowAny  # Change to IsAuthenticated in production
 
@@ -31,14 +39,59 @@ from .serializers import (
     DataImportLogSerializer,
     FileUploadSerializer,
     DataSourceInfoSerializer,
-    MetricSummarySerializer,
+    DateRangeFilterSerializer,
+    HealthRecordFilterSerializer,
+    BloodworkFilterSerializer,
 )
-from .services import IngestionService
+from .services import IngestionService, RecordStatsCache
 from .adapters import FitbitAdapter
 from .adapters.base import AdapterRegistry
 
+# Bytes per read/write when saving an upload (Django's chunks() use 64 KB)
+UPLOAD_BUFFER_SIZE = 2 * 1024 * 1024
 
-class HealthRecordViewSet(viewsets.ModelViewSet):
+# ZIPs with at least this many members are extracted on a thread pool
+# (zlib releases the GIL while inflating) of up to ZIP_MAX_WORKERS threads
+ZIP_PARALLEL_MIN_MEMBERS = 16
+ZIP_MAX_WORKERS = 8
+
+
+def _query_filters(request, serializer_class) -> dict:
+    """
+    Parse a list endpoint's query params once into typed values (dates as
+    date objects); a malformed value is a 400 rather than a query error.
+    """
+    params = serializer_class(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    return params.validated_data
+
+
+class FlatListMixin:
+    """
+    ?flat=1 on a list endpoint returns the serializer's fields straight
+    from .values(), skipping a model instance and a to_representation()
+    call per row. The JSON is the same, with datetimes in UTC.
+    """
+    
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('flat') not in ('1', 'true'):
+            return super().list(request, *args, **kwargs)
+        
+        fields = self.get_serializer_class().Meta.fields
+        queryset = self.filter_queryset(self.get_queryset()).values(*fields)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(list(queryset))
+
+
+class RecordPagination(LimitOffsetPagination):
+    """?limit=&offset= paging for the large record tables."""
+    default_limit = 1000
+    max_limit = 10000
+
+
+class HealthRecordViewSet(FlatListMixin, viewsets.ModelViewSet):
     """
     API endpoint for health records.
     
@@ -47,10 +100,15 @@ class HealthRecordViewSet(viewsets.ModelViewSet):
     GET /api/v1/health-records/?source=fitbit - Filter by source
     GET /api/v1/health-records/?date=2024-12-01 - Filter by date
     GET /api/v1/health-records/{id}/ - Get single record
+    
+    Lists are paginated: ?limit= (default 1000) and ?offset=;
+    add ?flat=1 to skip building a model instance per row.
     """
     
-    queryset = HealthRecord.objects.all()
+    # Load only the serialized columns (not raw_data, a compressed blob)
+    queryset = HealthRecord.objects.only(*HealthRecordSerializer.Meta.fields)
     serializer_class = HealthRecordSerializer
+    pagination_class = RecordPagination
     permission_classes = [AllowAny]  # TODO: Change to IsAuthenticated
     
     def get_queryset(self):
@@ -61,11 +119,12 @@ class HealthRecordViewSet(viewsets.ModelViewSet):
         #     queryset = queryset.filter(user=self.request.user)
         
         # Apply filters from query params
-        metric_type = self.request.query_params.get('metric_type')
-        source = self.request.query_params.get('source')
-        date = self.request.query_params.get('date')
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
+        filters = _query_filters(self.request, HealthRecordFilterSerializer)
+        metric_type = filters.get('metric_type')
+        source = filters.get('source')
+        date = filters.get('date')
+        start_date = filters.get('start_date')
+        end_date = filters.get('end_date')
         
         if metric_type:
             queryset = queryset.filter(metric_type=metric_type)
@@ -81,10 +140,16 @@ class HealthRecordViewSet(viewsets.ModelViewSet):
         return queryset
     
     @action(detail=False, methods=['get'])
+    @method_decorator(etag(
+        lambda request: RecordStatsCache.etag('health_records', request)
+    ))
     def summary(self, request):
         """
         GET /api/v1/health-records/summary/
         Get summary statistics grouped by metric type.
+        Cached per user and set of filters until health records change; a
+        matching If-None-Match gets a 304 after one cache lookup (a query,
+        with the database cache) instead of running the aggregate.
         """
         queryset = self.get_queryset()
         
@@ -97,27 +162,44 @@ class HealthRecordViewSet(viewsets.ModelViewSet):
             last_date=Max('date'),
         ).order_by('metric_type')
         
-        serializer = MetricSummarySerializer(summaries, many=True)
-        return Response(serializer.data)
+        # The rows are already JSON-ready (see MetricSummarySerializer for
+        # their shape), so they're returned without a serializer pass
+        return Response(RecordStatsCache.get_or_set(
+            'health_records', request, lambda: list(summaries)
+        ))
+    
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        RecordStatsCache.invalidate('health_records')
+    
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        RecordStatsCache.invalidate('health_records')
+    
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        RecordStatsCache.invalidate('health_records')
 
 
-class SleepLogViewSet(viewsets.ModelViewSet):
+class SleepLogViewSet(FlatListMixin, viewsets.ModelViewSet):
     """
     API endpoint for sleep logs.
     
     GET /api/v1/sleep-logs/ - List all sleep sessions
     GET /api/v1/sleep-logs/?start_date=2024-12-01&end_date=2024-12-31
+    GET /api/v1/sleep-logs/?flat=1 - Same rows, without a model instance per row
     """
     
-    queryset = SleepLog.objects.all()
+    queryset = SleepLog.objects.only(*SleepLogSerializer.Meta.fields)
     serializer_class = SleepLogSerializer
     permission_classes = [AllowAny]
     
     def get_queryset(self):
         queryset = super().get_queryset()
         
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
+        filters = _query_filters(self.request, DateRangeFilterSerializer)
+        start_date = filters.get('start_date')
+        end_date = filters.get('end_date')
         
         if start_date:
             queryset = queryset.filter(date_of_sleep__gte=start_date)
@@ -132,15 +214,16 @@ class NutritionLogViewSet(viewsets.ModelViewSet):
     API endpoint for nutrition logs.
     """
     
-    queryset = NutritionLog.objects.all()
+    queryset = NutritionLog.objects.only(*NutritionLogSerializer.Meta.fields)
     serializer_class = NutritionLogSerializer
     permission_classes = [AllowAny]
     
     def get_queryset(self):
         queryset = super().get_queryset()
         
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
+        filters = _query_filters(self.request, DateRangeFilterSerializer)
+        start_date = filters.get('start_date')
+        end_date = filters.get('end_date')
         
         if start_date:
             queryset = queryset.filter(date__gte=start_date)
@@ -156,19 +239,23 @@ class BloodworkResultViewSet(viewsets.ModelViewSet):
     
     POST /api/v1/bloodwork/ - Add new lab result
     GET /api/v1/bloodwork/?biomarker=vitamin_d - Filter by biomarker
+    
+    Lists are paginated: ?limit= (default 1000) and ?offset=.
     """
     
-    queryset = BloodworkResult.objects.all()
+    queryset = BloodworkResult.objects.only(*BloodworkResultSerializer.Meta.fields)
     serializer_class = BloodworkResultSerializer
+    pagination_class = RecordPagination
     permission_classes = [AllowAny]
     
     def get_queryset(self):
         queryset = super().get_queryset()
         
-        biomarker = self.request.query_params.get('biomarker')
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        flagged_only = self.request.query_params.get('flagged_only')
+        filters = _query_filters(self.request, BloodworkFilterSerializer)
+        biomarker = filters.get('biomarker')
+        start_date = filters.get('start_date')
+        end_date = filters.get('end_date')
+        flagged_only = filters.get('flagged_only')
         
         if biomarker:
             queryset = queryset.filter(biomarker=biomarker)
@@ -176,16 +263,22 @@ class BloodworkResultViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(test_date__gte=start_date)
         if end_date:
             queryset = queryset.filter(test_date__lte=end_date)
-        if flagged_only and flagged_only.lower() == 'true':
+        if flagged_only:
             queryset = queryset.filter(is_flagged=True)
         
         return queryset
     
     @action(detail=False, methods=['get'])
+    @method_decorator(etag(
+        lambda request: RecordStatsCache.etag('bloodwork', request)
+    ))
     def biomarkers(self, request):
         """
         GET /api/v1/bloodwork/biomarkers/
         List all unique biomarkers with their latest values.
+        Cached per user and set of filters until bloodwork results change;
+        a matching If-None-Match gets a 304 after one cache lookup (a query,
+        with the database cache) instead of running the aggregate.
         """
         # Get distinct biomarkers with counts
         biomarkers = self.get_queryset().values('biomarker').annotate(
@@ -194,7 +287,21 @@ class BloodworkResultViewSet(viewsets.ModelViewSet):
             last_test=Max('test_date'),
         ).order_by('biomarker')
         
-        return Response(list(biomarkers))
+        return Response(RecordStatsCache.get_or_set(
+            'bloodwork', request, lambda: list(biomarkers)
+        ))
+    
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        RecordStatsCache.invalidate('bloodwork')
+    
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        RecordStatsCache.invalidate('bloodwork')
+    
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        RecordStatsCache.invalidate('bloodwork')
 
 
 class DataImportLogViewSet(viewsets.ReadOnlyModelViewSet):
@@ -205,7 +312,7 @@ class DataImportLogViewSet(viewsets.ReadOnlyModelViewSet):
     GET /api/v1/imports/{batch_id}/ - Get import details
     """
     
-    queryset = DataImportLog.objects.all()
+    queryset = DataImportLog.objects.only(*DataImportLogSerializer.Meta.fields)
     serializer_class = DataImportLogSerializer
     permission_classes = [AllowAny]
     lookup_field = 'batch_id'
@@ -236,25 +343,26 @@ class FileUploadView(views.APIView):
         uploaded_file = serializer.validated_data['file']
         source = serializer.validated_data.get('source')
         
-        # Save uploaded file to temp location
         with tempfile.TemporaryDirectory() as tmpdir:
             tmpdir = Path(tmpdir)
-            file_path = tmpdir / uploaded_file.name
             
-            with open(file_path, 'wb') as f:
-                for chunk in uploaded_file.chunks():
-                    f.write(chunk)
-            
-            # If it's a ZIP, extract it
-            if file_path.suffix.lower() == '.zip':
+            # If it's a ZIP, extract it straight from the upload (already
+            # spooled to disk or held in memory by Django) instead of
+            # first copying the archive itself into tmpdir
+            if Path(uploaded_file.name).suffix.lower() == '.zip':
                 extract_dir = tmpdir / 'extracted'
                 extract_dir.mkdir()
                 
-                with zipfile.ZipFile(file_path, 'r') as zf:
-                    zf.extractall(extract_dir)
+                with zipfile.ZipFile(uploaded_file, 'r') as zf:
+                    self._extract_zip(zf, extract_dir)
                 
                 # Find the actual data folder (might be nested)
                 file_path = self._find_data_root(extract_dir)
+            else:
+                # Save uploaded file to temp location
+                file_path = tmpdir / uploaded_file.name
+                with open(file_path, 'wb') as f:
+                    shutil.copyfileobj(uploaded_file, f, UPLOAD_BUFFER_SIZE)
             
             # Process the file
             user = request.user if request.user.is_authenticated else None
@@ -267,18 +375,47 @@ class FileUploadView(views.APIView):
                 status=status.HTTP_201_CREATED if import_log.status == 'completed' else status.HTTP_400_BAD_REQUEST
             )
     
+    def _extract_zip(self, zf: zipfile.ZipFile, extract_dir: Path):
+        """
+        Extract every member of the archive into extract_dir.
+        
+        Large archives (Takeout exports hold thousands of small JSON files)
+        are inflated concurrently. ZipFile serialises the underlying reads
+        itself, and extract() keeps its path sanitising (no zip-slip).
+        """
+        members = zf.infolist()
+        workers = min(os.cpu_count() or 1, ZIP_MAX_WORKERS)
+        if len(members) < ZIP_PARALLEL_MIN_MEMBERS or workers == 1:
+            zf.extractall(extract_dir)
+            return
+        
+        def extract(member: zipfile.ZipInfo):
+            try:
+                zf.extract(member, extract_dir)
+            except FileExistsError:
+                # Another thread created the same parent folder first
+                zf.extract(member, extract_dir)
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # list() so an extraction error is raised here
+            list(pool.map(extract, members))
+    
     def _find_data_root(self, extract_dir: Path) -> Path:
         """
         Find the actual data folder in an extracted ZIP.
         Handles cases where the ZIP has a single root folder.
         """
-        children = list(extract_dir.iterdir())
-        
-        # If there's only one child and it's a directory, go into it
-        if len(children) == 1 and children[0].is_dir():
-            return self._find_data_root(children[0])
-        
-        return extract_dir
+        while True:
+            # scandir gives each entry's type without a stat() per child,
+            # and the listing stops as soon as a second entry turns up
+            with os.scandir(extract_dir) as entries:
+                first = next(entries, None)
+                only_child = first if next(entries, None) is None else None
+            
+            # If there's only one child and it's a directory, go into it
+            if only_child is None or not only_child.is_dir():
+                return extract_dir
+            extract_dir = Path(only_child.path)
 
 
 class DataSourcesView(views.APIView):
@@ -290,39 +427,44 @@ class DataSourcesView(views.APIView):
     
     permission_classes = [AllowAny]
     
+    SOURCES = [
+        {
+            'name': 'fitbit',
+            'label': 'Fitbit (Google Takeout)',
+            'supported_formats': ['zip', 'json', 'csv'],
+            'description': 'Upload your Google Takeout export containing Fitbit data.',
+        },
+        {
+            'name': 'garmin',
+            'label': 'Garmin Connect',
+            'supported_formats': ['zip', 'fit', 'csv'],
+            'description': 'Coming soon: Garmin Connect data export.',
+        },
+        {
+            'name': 'oura',
+            'label': 'Oura Ring',
+            'supported_formats': ['json', 'csv'],
+            'description': 'Coming soon: Oura Ring data export.',
+        },
+        {
+            'name': 'cronometer',
+            'label': 'Cronometer',
+            'supported_formats': ['csv'],
+            'description': 'Coming soon: Cronometer nutrition export.',
+        },
+        {
+            'name': 'apple_health',
+            'label': 'Apple Health',
+            'supported_formats': ['zip', 'xml'],
+            'description': 'Coming soon: Apple Health export.',
+        },
+    ]
+    # Static payload: serialized once at import rather than per request
+    SOURCES_DATA = DataSourceInfoSerializer(SOURCES, many=True).data
+    SOURCES_ETAG = blake2b(repr(SOURCES).encode(), digest_size=8).hexdigest()
+    
+    @method_decorator(etag(lambda request: DataSourcesView.SOURCES_ETAG))
     def get(self, request):
-        sources = [
-            {
-                'name': 'fitbit',
-                'label': 'Fitbit (Google Takeout)',
-                'supported_formats': ['zip', 'json', 'csv'],
-                'description': 'Upload your Google Takeout export containing Fitbit data.',
-            },
-            {
-                'name': 'garmin',
-                'label': 'Garmin Connect',
-                'supported_formats': ['zip', 'fit', 'csv'],
-                'description': 'Coming soon: Garmin Connect data export.',
-            },
-            {
-                'name': 'oura',
-                'label': 'Oura Ring',
-                'supported_formats': ['json', 'csv'],
-                'description': 'Coming soon: Oura Ring data export.',
-            },
-            {
-                'name': 'cronometer',
-                'label': 'Cronometer',
-                'supported_formats': ['csv'],
-                'description': 'Coming soon: Cronometer nutrition export.',
-            },
-            {
-                'name': 'apple_health',
-                'label': 'Apple Health',
-                'supported_formats': ['zip', 'xml'],
-                'description': 'Coming soon: Apple Health export.',
-            },
-        ]
-        
-        serializer = DataSourceInfoSerializer(sources, many=True)
-        return Response(serializer.data)
+        response = Response(self.SOURCES_DATA)
+        patch_cache_control(response, public=True, max_age=3600)
+        return response